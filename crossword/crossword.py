@@ -61,6 +61,23 @@ class Crossword():
         with open(words_file) as f:
             self.words = set(f.read().upper().splitlines())
 
+        # Index words by number, and bitsets of word numbers (bit k set for word k):
+        #    lengths[n], the words of length n; and
+        #    letters[n, k][c], the words of length n whose kth character is c
+        self.word_list = sorted(self.words)
+        self.word_numbers = {word: number for number, word in enumerate(self.word_list)}
+        lengths = dict()
+        letters = dict()
+        for number, word in enumerate(self.word_list):
+            lengths.setdefault(len(word), []).append(number)
+            for k, letter in enumerate(word):
+                letters.setdefault((len(word), k), dict()).setdefault(letter, []).append(number)
+        self.lengths = {n: bitset(numbers) for n, numbers in lengths.items()}
+        self.letters = {
+            key: {letter: bitset(numbers) for letter, numbers in position.items()}
+            for key, position in letters.items()
+        }
+
         # Determine variable set
         self.variables = set()
         for i in range(self.height):
@@ -131,3 +148,20 @@ class Crossword():
             v for v in self.variables
             if v != var and self.overlaps[v, var]
         )
+
+    def words_in(self, bits):
+        """Given a bitset of word numbers, return the list of those words."""
+        return [
+            self.word_list[number]
+            for number, bit in enumerate(bin(bits)[:1:-1])
+            if bit == "1"
+        ]
+
+
+def bitset(numbers):
+    """Given word numbers, return the bitset with their bits set."""
+    numbers = list(numbers)
+    bits = bytearray(max(numbers, default=0) // 8 + 1)
+    for number in numbers:
+        bits[number >> 3] |= 1 << (number & 7)
+    return int.from_bytes(bits, "little")
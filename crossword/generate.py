@@ -11,10 +11,15 @@ class CrosswordCreator():
         Create new CSP crossword generate.
         """
         self.crossword = crossword
+        # Domains are bitsets of word numbers (see `Crossword.word_list`),
+        # starting with every word.
         self.domains = {
-            var: self.crossword.words.copy()
+            var: (1 << len(self.crossword.word_list)) - 1
             for var in self.crossword.variables
         }
+        self.overlapping = {
+            key: val for key, val in self.crossword.overlaps.items() if val is not None
+        }
 
     def letter_grid(self, assignment):
         """
@@ -100,12 +105,10 @@ class CrosswordCreator():
         (Remove any values that are inconsistent with a variable's unary
          constraints; in this case, the length of the word.)
         """
-        for variable, values in self.domains.items():
-            for value in values.copy():
-                # If a value doesn't satisfy the length unary constraint,
-                # it'll be removed from the variable domain.
-                if len(value) != variable.length:
-                    self.domains[variable].remove(value)
+        for variable in self.domains:
+            # Only the words satisfying the length unary constraint
+            # are kept in the variable domain.
+            self.domains[variable] &= self.crossword.lengths.get(variable.length, 0)
 
     def revise(self, x, y):
         """
@@ -116,25 +119,20 @@ class CrosswordCreator():
         Return True if a revision was made to the domain of `x`; return
         False if no revision was made.
         """
-        revised = False
-        overlaps = self.overlaps()
+        # We find the indexes for the overlapping characters' positions.
+        x_index, y_index = self.overlaps()[x, y]
+        x_letters = self.crossword.letters.get((x.length, x_index), dict())
+        matches = 0
 
-        for value_x in self.domains[x].copy():
-            # We find the indexes for the overlapping characters' positions.
-            x_index = overlaps[x, y][0]
-            y_index = overlaps[x, y][1]
-            matches = 0
-
-            for value_y in self.domains[y]:
-                # If the characters in the overlapping positions given by the indexes match,
-                # we increase the matches by 1.
-                if value_x[x_index] == value_y[y_index]:
-                    matches += 1
-            # If there are no matches at all for that value_x in y domain,
-            # we remove the value from x domain and we set revised to true.
-            if matches == 0:
-                self.domains[x].remove(value_x)
-                revised = True
+        for letter, words in self.crossword.letters.get((y.length, y_index), dict()).items():
+            # If some value in y domain has this character in the overlapping position,
+            # the values of x with the same character there have a match.
+            if self.domains[y] & words:
+                matches |= x_letters.get(letter, 0)
+
+        # We remove the values with no matches at all from x domain.
+        revised = (self.domains[x] & ~matches) != 0
+        self.domains[x] &= matches
 
         return revised
 
@@ -158,7 +156,7 @@ class CrosswordCreator():
 
             if self.revise(x, y):
                 # If, after revising the pair, the domain of x is empty, we return False
-                if len(self.domains[x]) == 0:
+                if self.domains[x] == 0:
                     return False
                 # We add to the queue all the pairs made by x and its neighbours,
                 # except for the one already examined.
@@ -222,18 +220,15 @@ class CrosswordCreator():
 
         ruled_out_values = dict()
         # For each value in the variable domain,
-        for value_x in self.domains[var]:
+        for value_x in self.crossword.words_in(self.domains[var]):
             ruled_out_values_count = 0
             # we find the unassigned neighbouring variables and their overlapping values.
             for un_var in unassigned_vars:
-                x_index = overlaps[var, un_var][0]
-                y_index = overlaps[var, un_var][1]
-
-                for value_y in self.domains[un_var]:
-                    # If the characters in the overlapping positions given by the indexes don't match,
-                    # we increase the ruled_out_values_count by 1.
-                    if value_x[x_index] != value_y[y_index]:
-                        ruled_out_values_count += 1
+                x_index, y_index = overlaps[var, un_var]
+                matches = self.crossword.letters.get((un_var.length, y_index), dict()).get(value_x[x_index], 0)
+                # The values whose characters in the overlapping positions given by the indexes don't match
+                # are ruled out, so we increase the ruled_out_values_count by their number.
+                ruled_out_values_count += (self.domains[un_var] & ~matches).bit_count()
             # Finally, we assign to each value its corresponding ruled_out_values_count
             ruled_out_values[value_x] = ruled_out_values_count
         # and we sort the value in ascending order (using the sort() method defined below).
@@ -251,7 +246,7 @@ class CrosswordCreator():
         """
         variables = self.crossword.variables - set(assignment.keys())
         # We assign to each remaining variable the count of the values still in its domain.
-        mrvs = {var: len(self.domains[var]) for var in variables}
+        mrvs = {var: self.domains[var].bit_count() for var in variables}
         # We find the minimum value between all the variables' values count.
         min_value = min(mrvs.values())
         # We find the one (or ones) whose value correspond to the min value.
@@ -291,24 +286,28 @@ class CrosswordCreator():
         for value in self.order_domain_values(var, assignment):
             assignment[var] = value
             # For each value in the ordered domain values, we check overall consistency
-            # and arc consistency after adding a variable to the assignment.
+            # and arc consistency after adding a variable to the assignment
+            # (reducing the variable domain to the value).
             if self.consistent(assignment):
-                if self.ac3(arcs):
+                # Domains are integers, so a shallow copy saves them.
+                domains = self.domains.copy()
+                self.domains[var] = 1 << self.crossword.word_numbers[value]
+                if self.ac3(list(arcs)):
                     # If checks are successful, we recursively call the backtrack function,
                     result = self.backtrack(assignment)
                     # and if the result is not none, we return it (the completed assignment).
                     if result is not None:
                         return result
+                # Otherwise we restore the domains pruned for this value.
+                self.domains = domains
 
-                    del assignment[var]
+            del assignment[var]
 
         return None
 
-    # Removes all the overlaps pairs whose value is None.
+    # Returns the overlaps pairs whose value is not None.
     def overlaps(self):
-        overlaps = {key: val for key, val in self.crossword.overlaps.items() if val is not None}
-
-        return overlaps
+        return self.overlapping
 
 
 # Returns a sorted dictionary.
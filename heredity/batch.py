@@ -0,0 +1,174 @@
+import argparse
+import csv
+import functools
+import multiprocessing
+import os
+import time
+
+import numpy
+
+from elimination import Network, pedigree_shape
+from heredity import load_data, person_data
+
+# Output columns: a row per person
+FIELDS = ["family", "name", "gene_2", "gene_1", "gene_0", "trait", "seconds", "cached", "error"]
+# Output columns of probabilities and timings (NaN for families that failed)
+NUMBERS = ["gene_2", "gene_1", "gene_0", "trait", "seconds"]
+# Input columns of a person (as read by `heredity.load_data`)
+COLUMNS = ["name", "mother", "father", "trait"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute gene and trait probabilities of many families.")
+    parser.add_argument("input", help="directory of family CSV files, or a CSV file with a family column")
+    parser.add_argument("output", help="file to write every person's probabilities to: "
+                        "a NumPy .npz archive of columns, or a CSV file otherwise")
+    parser.add_argument("-p", "--processes", type=int, default=multiprocessing.cpu_count(),
+                        help="number of worker processes")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        families = load_families(args.input)
+    except ValueError as error:
+        parser.error(str(error))
+    statistics = process_families(families, args.output, args.processes)
+    elapsed = time.perf_counter() - start
+
+    print(f"Families: {statistics['families']} ({statistics['people']} people) in {elapsed:.2f}s")
+    print(f"  Compiled networks reused: {statistics['cached']}")
+    if statistics["failed"]:
+        print(f"  Failed: {statistics['failed']}")
+
+
+def load_families(path):
+    """
+    Load families from `path`, either a directory of CSV files (one family per file,
+    named after the file) or a CSV file with a family field besides
+    the fields of `heredity.load_data`.
+    Return a dictionary mapping each family name to its people's data, or to
+    the ValueError explaining why the family's file could not be read
+    (so the other families are still processed).
+    """
+    if os.path.isdir(path):
+        families = dict()
+        for filename in sorted(os.listdir(path)):
+            if not filename.endswith(".csv"):
+                continue
+            family = os.path.splitext(filename)[0]
+            try:
+                families[family] = load_data(os.path.join(path, filename))
+            except KeyError as error:
+                families[family] = ValueError(f"{filename} has no {error.args[0]} column")
+            except (csv.Error, UnicodeDecodeError) as error:
+                families[family] = ValueError(f"cannot read {filename}: {error}")
+        return families
+
+    families = dict()
+    with open(path) as f:
+        reader = csv.DictReader(f)
+        missing = [column for column in ["family"] + COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{path} has no {', '.join(missing)} column")
+        for row in reader:
+            families.setdefault(row["family"], dict())[row["name"]] = person_data(row)
+    return families
+
+
+def process_families(families, output, processes):
+    """
+    Compute the probabilities of every family of `families` across `processes`
+    worker processes, and write them (in the order of `families`) to `output`:
+    if it is an .npz file, as a NumPy archive with an array per field of FIELDS
+    (written once every family is done), otherwise as a CSV file with a row
+    per person (written as families complete).
+    Return the number of families, people (of families that did not fail),
+    families whose compiled network was reused, and families that failed.
+    """
+    statistics = {"families": 0, "people": 0, "cached": 0, "failed": 0}
+    columnar = output.endswith(".npz")
+    columns = {field: [] for field in FIELDS}
+
+    with open(output, "wb") if columnar else open(output, "w", newline="") as f, \
+            multiprocessing.Pool(processes) as pool:
+        if not columnar:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+        chunksize = max(1, len(families) // (processes * 16))
+        for rows in pool.imap(process_family, families.items(), chunksize=chunksize):
+            if columnar:
+                for field in FIELDS:
+                    columns[field].extend(row[field] for row in rows)
+            else:
+                writer.writerows(csv_row(row) for row in rows)
+            statistics["families"] += 1
+            statistics["people"] += sum(1 for row in rows if not row["error"])
+            statistics["cached"] += rows[0]["cached"]
+            statistics["failed"] += bool(rows[0]["error"])
+
+        if columnar:
+            numpy.savez_compressed(f, **{
+                field: numpy.array(values, dtype=float if field in NUMBERS else bool if field == "cached" else str)
+                for field, values in columns.items()
+            })
+
+    return statistics
+
+
+def csv_row(row):
+    """
+    Return an output row formatted for CSV files (numbers with 6 decimals, blank if missing).
+    """
+    return row | {field: "" if numpy.isnan(row[field]) else f"{row[field]:.6f}" for field in NUMBERS}
+
+
+def process_family(job):
+    """
+    Compute the probabilities of a family, given its name and people's data,
+    with variable elimination.
+    Return the output rows of the family's people, with the time taken and
+    whether the family's network was compiled for an earlier family of the same shape
+    (or a single row with the error, if the family cannot be loaded or processed).
+    """
+    family, people = job
+    start = time.perf_counter()
+
+    try:
+        if isinstance(people, ValueError):
+            raise people
+        names, shape = pedigree_shape(people)
+        hits = compiled_network.cache_info().hits
+        network = compiled_network(shape)
+        cached = compiled_network.cache_info().hits > hits
+        genes, traits = network.marginals([people[name]["trait"] for name in names])
+    except ValueError as error:
+        return [dict.fromkeys(FIELDS, "") | dict.fromkeys(NUMBERS, numpy.nan) |
+                {"family": family, "cached": False, "error": str(error)}]
+
+    seconds = time.perf_counter() - start
+    return [
+        {
+            "family": family,
+            "name": name,
+            "gene_2": float(genes[person, 2]),
+            "gene_1": float(genes[person, 1]),
+            "gene_0": float(genes[person, 0]),
+            "trait": float(traits[person]),
+            "seconds": seconds,
+            "cached": cached,
+            "error": ""
+        }
+        for person, name in enumerate(names)
+    ]
+
+
+@functools.lru_cache(maxsize=4096)
+def compiled_network(shape):
+    """
+    Return the compiled `Network` of families of `shape` (cached by each worker process).
+    """
+    return Network(list(shape))
+
+
+if __name__ == "__main__":
+    main()
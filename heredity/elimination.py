@@ -0,0 +1,273 @@
+import heapq
+import itertools
+import sys
+
+import numpy
+
+from heredity import load_data, print_probabilities, probability_tables, to_probabilities
+
+# Largest number of gene variables multiplied at once by variable elimination
+# (3 ** 12 values, about 4 MB per factor)
+MAX_WIDTH = 12
+
+
+def main():
+
+    # Check for proper usage
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python elimination.py data.csv")
+    people = load_data(sys.argv[1])
+
+    try:
+        probabilities = variable_elimination(people)
+    except ValueError as error:
+        sys.exit(error)
+
+    # Print results
+    print_probabilities(probabilities)
+
+
+def variable_elimination(people):
+    """
+    Return the gene and trait probability distributions of each person in `people`
+    (in the format of `heredity.main`), computed exactly by variable elimination
+    on the family's Bayesian network.
+    Raise ValueError if the network is too wide for exact inference.
+    """
+    names, network = compile_network(people)
+    genes, traits = network.marginals([people[name]["trait"] for name in names])
+
+    return to_probabilities(names, genes, traits)
+
+
+def compile_network(people):
+    """
+    Return the list of names of `people`, and the `Network` of their genes
+    (where people are numbered in the order of that list).
+    Raise ValueError if the network is too wide for exact inference.
+    """
+    names, shape = pedigree_shape(people)
+
+    return names, Network(list(shape))
+
+
+def pedigree_shape(people):
+    """
+    Return the list of names of `people`, and the family's shape: for each person
+    (in the order of that list), None or the numbers of their mother and father.
+    Families listing people in the same order with the same relations share a shape
+    (and a compiled network), whatever their names and traits.
+    Raise ValueError if someone has only one parent, or a parent who is not in `people`.
+    """
+    names = list(people)
+    index = {name: person for person, name in enumerate(names)}
+    shape = []
+    for name in names:
+        mother, father = people[name]["mother"], people[name]["father"]
+        if mother is None and father is None:
+            shape.append(None)
+            continue
+        if mother is None or father is None:
+            raise ValueError(f"{name} has a {'father' if mother is None else 'mother'} but no "
+                             f"{'mother' if mother is None else 'father'}")
+        for parent in (mother, father):
+            if parent not in index:
+                raise ValueError(f"{name}'s parent {parent} is not in the family")
+        shape.append((index[mother], index[father]))
+
+    return names, tuple(shape)
+
+
+class Network():
+    """
+    Bayesian network of a family, with a gene count variable per person,
+    whose distribution depends on their parents' gene counts (if any).
+    Traits only depend on the gene count of their person, so observed traits
+    are absorbed in their person's factor, and unobserved traits are
+    computed from their person's gene count distribution.
+
+    The network is compiled (choosing an elimination order, and the variables
+    of every factor computed when eliminating in that order) once per family
+    structure: only the numbers depend on the traits observed.
+    """
+
+    def __init__(self, parents):
+        """
+        Compile a network for people whose `parents` are either None or
+        a pair of the numbers of their mother and their father.
+        Raise ValueError if eliminating in the chosen order multiplies more than
+        `MAX_WIDTH` gene variables at once (too much memory for exact inference).
+        """
+        self.parents = parents
+        n = len(parents)
+
+        # Each person's factor: their gene count given their parents' gene counts (if any).
+        self.scopes = [
+            (person,) if parents[person] is None else (*parents[person], person)
+            for person in range(n)
+        ]
+        self.order = elimination_order(n, self.scopes)
+        position = [0] * n
+        for step, person in enumerate(self.order):
+            position[person] = step
+
+        # Step `k` eliminates `order[k]`, multiplying the people's factors that
+        # mention it first (`factors[k]`) and the messages of the earlier steps whose
+        # variables it first mentions (`children[k]`), over the variables of `cliques[k]`.
+        # Summing `order[k]` out gives a message over the variables `messages[k]`
+        # for the step eliminating the first of them (`parent[k]`, None if there is none).
+        self.factors = [[] for _ in range(n)]
+        self.children = [[] for _ in range(n)]
+        self.cliques = [None] * n
+        self.messages = [None] * n
+        self.parent = [None] * n
+        for person, scope in enumerate(self.scopes):
+            self.factors[min(position[variable] for variable in scope)].append(person)
+
+        for step, person in enumerate(self.order):
+            clique = set()
+            for factor in self.factors[step]:
+                clique.update(self.scopes[factor])
+            for child in self.children[step]:
+                clique.update(self.messages[child])
+            self.cliques[step] = tuple(sorted(clique))
+            self.messages[step] = tuple(variable for variable in self.cliques[step] if variable != person)
+            if self.messages[step]:
+                self.parent[step] = min(position[variable] for variable in self.messages[step])
+                self.children[self.parent[step]].append(step)
+
+        if self.width() > MAX_WIDTH:
+            raise ValueError(
+                f"Network too wide for exact inference ({self.width()} genes at once, "
+                f"at most {MAX_WIDTH}): approximate it with sampling.py instead"
+            )
+
+    def width(self):
+        """
+        Return the number of variables of the network's largest clique.
+        """
+        return max(len(clique) for clique in self.cliques)
+
+    def marginals(self, traits):
+        """
+        Return the gene count distribution of each person (as an array with
+        one row per person and one column per gene count) and each person's
+        probability of having the trait, given their `traits` (True or False
+        if known, None otherwise).
+
+        Messages are passed from the first step eliminated to the last, and back,
+        so every person's distribution is computed in two passes over the steps.
+        """
+        prior, inheritance, trait_table = probability_tables()
+        n = len(self.parents)
+
+        # Each person's factor, times the probability of their trait if known.
+        values = []
+        for person, trait in enumerate(traits):
+            likelihood = 1.0 if trait is None else trait_table[:, int(trait)]
+            values.append((prior if self.parents[person] is None else inheritance) * likelihood)
+
+        # Messages from each step to the step it is passed to.
+        up = [None] * n
+        for step in range(n):
+            operands = [(values[factor], self.scopes[factor]) for factor in self.factors[step]]
+            operands += [(up[child], self.messages[child]) for child in self.children[step]]
+            up[step] = contract(operands, self.messages[step])
+
+        # Messages back to each step, from the step it was passed to.
+        down = [None] * n
+        genes = numpy.empty((n, 3))
+        for step in reversed(range(n)):
+            operands = [(values[factor], self.scopes[factor]) for factor in self.factors[step]]
+            if self.parent[step] is not None:
+                operands.append((down[step], self.messages[step]))
+            incoming = [(up[child], self.messages[child]) for child in self.children[step]]
+
+            for k, child in enumerate(self.children[step]):
+                down[child] = contract(operands + incoming[:k] + incoming[k + 1:], self.messages[child])
+            genes[self.order[step]] = contract(operands + incoming, (self.order[step],))
+
+        # Observed traits are certain, others depend on the person's genes.
+        have_trait = genes @ trait_table[:, 1]
+        for person, trait in enumerate(traits):
+            if trait is not None:
+                have_trait[person] = float(trait)
+
+        return genes, have_trait
+
+
+def contract(operands, variables):
+    """
+    Multiply the factors `operands` (pairs of an array and the variables
+    of its axes), sum out every variable not in `variables`, and return
+    the result normalized to sum to 1 (probabilities are only needed up to
+    a constant, and this avoids underflows in large families).
+    Variables of `variables` that no operand mentions are uniform.
+    """
+    labels = dict()
+    arguments = []
+    for values, scope in operands:
+        arguments += [values, [labels.setdefault(variable, len(labels)) for variable in scope]]
+    missing = [variable for variable in variables if variable not in labels]
+    if missing:
+        arguments += [numpy.ones((3,) * len(missing)), [labels.setdefault(variable, len(labels)) for variable in missing]]
+    result = numpy.einsum(*arguments, [labels[variable] for variable in variables])
+
+    return result / result.sum()
+
+
+def elimination_order(n, scopes):
+    """
+    Return an order to eliminate the variables `0` to `n - 1` in, for factors
+    over `scopes`, greedily choosing the variable whose elimination connects
+    the fewest unconnected pairs of its neighbours (min-fill), and then
+    the one with the fewest neighbours (min-degree).
+    Variables are connected if they share a factor, so for families,
+    people are connected to their parents, and parents to each other.
+    """
+    neighbours = [set() for _ in range(n)]
+    for scope in scopes:
+        for variable in scope:
+            neighbours[variable].update(scope)
+    for variable in range(n):
+        neighbours[variable].discard(variable)
+
+    def score(variable):
+        fill = sum(
+            1 for first, second in itertools.combinations(neighbours[variable], 2)
+            if second not in neighbours[first]
+        )
+        return fill, len(neighbours[variable])
+
+    scores = [score(variable) for variable in range(n)]
+    heap = [(scores[variable], variable) for variable in range(n)]
+    heapq.heapify(heap)
+    eliminated = [False] * n
+    order = []
+
+    while heap:
+        variable_score, variable = heapq.heappop(heap)
+        # Skip variables already eliminated, or whose score has changed since pushed.
+        if eliminated[variable] or variable_score != scores[variable]:
+            continue
+        eliminated[variable] = True
+        order.append(variable)
+
+        # Connect the variable's neighbours to each other.
+        for neighbour in neighbours[variable]:
+            neighbours[neighbour].discard(variable)
+            neighbours[neighbour].update(neighbours[variable] - {neighbour})
+
+        # Only the scores of the neighbours and their own neighbours can have changed.
+        affected = set(neighbours[variable])
+        for neighbour in neighbours[variable]:
+            affected.update(neighbours[neighbour])
+        for neighbour in affected:
+            scores[neighbour] = score(neighbour)
+            heapq.heappush(heap, (scores[neighbour], neighbour))
+
+    return order
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ import csv
 import itertools
 import sys
 
+import numpy
+
 PROBS = {
 
     # Unconditional probabilities for having gene
@@ -37,13 +39,33 @@ PROBS = {
 }
 
 
+# Number of gene configurations evaluated at once by `vectorized_probabilities`
+BATCH_SIZE = 65536
+
+
 def main():
 
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
+    if len(sys.argv) not in [2, 3] or (len(sys.argv) == 3 and sys.argv[2] not in METHODS):
+        sys.exit(f"Usage: python heredity.py data.csv [{'|'.join(METHODS)}]")
     people = load_data(sys.argv[1])
 
+    # Print results (and statistics of the method, if chosen explicitly)
+    if len(sys.argv) == 3:
+        probabilities = METHODS[sys.argv[2]](people, report=True)
+    else:
+        probabilities = enumerate_probabilities(people)
+    print_probabilities(probabilities)
+
+
+def enumerate_probabilities(people, report=False):
+    """
+    Return the gene and trait probability distributions of each person in `people`,
+    summing the joint probabilities of every assignment of genes and traits
+    consistent with the observed traits, and print how many joint probabilities
+    were evaluated if `report` is True.
+    """
+
     # Keep track of gene and trait probabilities for each person
     probabilities = {
         person: {
@@ -60,31 +82,193 @@ def main():
         for person in people
     }
 
-    # Loop over all sets of people who might have the trait
-    names = set(people)
-    for have_trait in powerset(names):
-
-        # Check if current set of people violates known information
-        fails_evidence = any(
-            (people[person]["trait"] is not None and
-             people[person]["trait"] != (person in have_trait))
-            for person in names
-        )
-        if fails_evidence:
-            continue
-
-        # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
-                # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
+    # Loop over the gene assignments that are possible given the observed traits
+    evaluations = 0
+    for one_gene, two_genes in gene_assignments(people):
+        # Loop over the sets of people who might have the trait, given the observed traits
+        for have_trait in trait_assignments(people):
+            # Update probabilities with new joint probability
+            p = joint_probability(people, one_gene, two_genes, have_trait)
+            update(probabilities, one_gene, two_genes, have_trait, p)
+            evaluations += 1
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
 
-    # Print results
+    if report:
+        unobserved = sum(1 for person in people if people[person]["trait"] is None)
+        total = 3 ** len(people) * 2 ** unobserved
+        print(f"Trait assignments: {2 ** unobserved} of {2 ** len(people)} "
+              f"({2 ** len(people) - 2 ** unobserved} inconsistent with evidence skipped)")
+        print(f"Joint probabilities evaluated: {evaluations} of {total} "
+              f"({total - evaluations} with zero probability saved)")
+
+    return probabilities
+
+
+def gene_assignments(people):
+    """
+    Yield every assignment of gene counts to `people` that has a nonzero
+    probability given the observed traits, as a pair of the sets of people
+    with one copy and with two copies of the gene.
+
+    People are assigned gene counts parents first, so that assignments are
+    abandoned as soon as a person's gene count is impossible, given their
+    parents' gene counts and their trait, skipping all assignments of the people after them.
+    """
+    prior, inheritance, trait_table = probability_tables()
+    order = parents_first(people)
+    genes = dict()
+
+    def assign(k):
+        # Every person has a gene count.
+        if k == len(order):
+            yield (
+                {person for person in order if genes[person] == 1},
+                {person for person in order if genes[person] == 2}
+            )
+            return
+
+        person = order[k]
+        mother = people[person]["mother"]
+        father = people[person]["father"]
+        trait = people[person]["trait"]
+        for gene in (0, 1, 2):
+            p = prior[gene] if mother is None else inheritance[genes[mother], genes[father], gene]
+            if trait is not None:
+                p *= trait_table[gene, int(trait)]
+            if p == 0:
+                continue
+            genes[person] = gene
+            yield from assign(k + 1)
+
+    yield from assign(0)
+
+
+def trait_assignments(people):
+    """
+    Yield every set of people who might have the trait, given the observed traits:
+    people with observed traits are fixed, and each bit of a bitmask
+    tells whether a person whose trait is unknown has it.
+    """
+    have_trait = {person for person in people if people[person]["trait"]}
+    unobserved = [person for person in people if people[person]["trait"] is None]
+
+    for mask in range(1 << len(unobserved)):
+        yield have_trait | {person for i, person in enumerate(unobserved) if mask >> i & 1}
+
+
+def parents_first(people):
+    """
+    Return the list of `people`, ordered so that parents come before their children.
+    """
+    order = []
+    visited = set()
+
+    def visit(person):
+        if person in visited:
+            return
+        visited.add(person)
+        for parent in (people[person]["mother"], people[person]["father"]):
+            if parent is not None:
+                visit(parent)
+        order.append(person)
+
     for person in people:
+        visit(person)
+
+    return order
+
+
+def vectorized_probabilities(people, batch_size=BATCH_SIZE, report=False):
+    """
+    Return the gene and trait probability distributions of each person in `people`,
+    summing joint probabilities of every gene configuration with NumPy,
+    `batch_size` configurations at a time, and print how many were evaluated
+    if `report` is True.
+
+    Unobserved traits are summed out rather than enumerated: their probability
+    given the person's genes sums to 1, so only observed traits weigh the
+    joint probabilities, and unobserved traits' distributions follow from genes.
+    """
+    names, mothers, fathers, traits = encode_people(people)
+    n = len(names)
+    trait_table = probability_tables()[2]
+
+    genes = numpy.zeros(3 * n)
+    have_trait = numpy.zeros(n)
+    for start in range(0, 3 ** n, batch_size):
+        configurations = gene_configurations(n, start, min(start + batch_size, 3 ** n))
+        p = joint_probabilities(mothers, fathers, traits, configurations)
+
+        # Add each configuration's probability to each person's gene count, and trait.
+        genes += numpy.bincount((configurations + 3 * numpy.arange(n)).ravel(),
+                                weights=numpy.repeat(p, n), minlength=3 * n)
+        have_trait += p @ trait_table[configurations, 1]
+
+    # Ensure probabilities sum to 1, observed traits being certain.
+    genes = genes.reshape(n, 3)
+    total = genes[0].sum()
+    have_trait = numpy.where(traits == 2, have_trait / total, traits)
+
+    if report:
+        print(f"Gene configurations evaluated: {3 ** n} in {-(-3 ** n // batch_size)} batches")
+
+    return to_probabilities(names, genes / total, have_trait)
+
+
+def encode_people(people):
+    """
+    Return the list of names of `people`, and arrays of each person's mother's
+    and father's numbers (in that list, -1 for no parent) and trait
+    (0 for no trait, 1 for trait, 2 if unknown).
+    """
+    names = list(people)
+    index = {name: person for person, name in enumerate(names)}
+    mothers = numpy.array([index.get(people[name]["mother"], -1) for name in names], dtype=numpy.int64)
+    fathers = numpy.array([index.get(people[name]["father"], -1) for name in names], dtype=numpy.int64)
+    traits = numpy.array([2 if people[name]["trait"] is None else int(people[name]["trait"]) for name in names])
+
+    return names, mothers, fathers, traits
+
+
+def gene_configurations(n, start, stop):
+    """
+    Return an array of the gene configurations of `n` people numbered `start`
+    to `stop - 1`, with one row per configuration and one column per person:
+    configuration `k` gives person `i` the `i`-th base 3 digit of `k` as gene count.
+    """
+    codes = numpy.arange(start, stop, dtype=numpy.int64)
+
+    return codes[:, None] // 3 ** numpy.arange(n, dtype=numpy.int64) % 3
+
+
+def joint_probabilities(mothers, fathers, traits, configurations):
+    """
+    Return the joint probability of each gene configuration of `configurations`
+    (an array with one row per configuration, one column per person) and of
+    the observed traits, for people with parents `mothers` and `fathers`,
+    and `traits` (as encoded by `encode_people`).
+    """
+    prior, inheritance, trait_table = probability_tables()
+    # Probability of a trait that is not observed.
+    trait_table = numpy.column_stack([trait_table, numpy.ones(3)])
+
+    founders = mothers < 0
+    genes_probabilities = numpy.where(
+        founders,
+        prior[configurations],
+        inheritance[configurations[:, mothers], configurations[:, fathers], configurations]
+    )
+
+    return (genes_probabilities * trait_table[configurations, traits]).prod(axis=1)
+
+
+def print_probabilities(probabilities):
+    """
+    Print each person's gene and trait probability distributions.
+    """
+    for person in probabilities:
         print(f"{person}:")
         for field in probabilities[person]:
             print(f"  {field.capitalize()}:")
@@ -104,17 +288,23 @@ def load_data(filename):
     with open(filename) as f:
         reader = csv.DictReader(f)
         for row in reader:
-            name = row["name"]
-            data[name] = {
-                "name": name,
-                "mother": row["mother"] or None,
-                "father": row["father"] or None,
-                "trait": (True if row["trait"] == "1" else
-                          False if row["trait"] == "0" else None)
-            }
+            data[row["name"]] = person_data(row)
     return data
 
 
+def person_data(row):
+    """
+    Return a person's data from a CSV row with fields name, mother, father, trait.
+    """
+    return {
+        "name": row["name"],
+        "mother": row["mother"] or None,
+        "father": row["father"] or None,
+        "trait": (True if row["trait"] == "1" else
+                  False if row["trait"] == "0" else None)
+    }
+
+
 def powerset(s):
     """
     Return a list of all possible subsets of set s.
@@ -265,5 +455,55 @@ def map_people_to_genes(dictionary, one_gene, two_genes):
     return people
 
 
+def probability_tables():
+    """
+    Return the probabilities in PROBS as NumPy lookup tables, indexed by gene counts:
+        * `prior[g]`: probability of having `g` copies of the gene, for people with no parents
+        * `inheritance[m, f, g]`: probability of having `g` copies of the gene,
+          for people whose mother has `m` copies and father has `f` copies
+        * `trait[g, t]`: probability of having the trait (`t` = 1) or not (`t` = 0)
+          given `g` copies of the gene
+    """
+    genes = range(3)
+    prior = numpy.array([PROBS["gene"][gene] for gene in genes])
+    trait = numpy.array([[PROBS["trait"][gene][False], PROBS["trait"][gene][True]] for gene in genes])
+
+    # Probability of each parent passing the gene on, given their gene count.
+    mutation = PROBS["mutation"]
+    passing = numpy.array([mutation, 0.5, 1.0 - mutation])
+    mother = passing[:, None]
+    father = passing[None, :]
+    inheritance = numpy.stack([
+        (1 - mother) * (1 - father),
+        mother * (1 - father) + (1 - mother) * father,
+        mother * father
+    ], axis=-1)
+
+    return prior, inheritance, trait
+
+
+def to_probabilities(names, genes, traits):
+    """
+    Return the gene and trait probability distributions of people `names`
+    in the format of `main`, from an array of their gene count probabilities
+    (one row per person, one column per gene count) and an array of their
+    probabilities of having the trait.
+    """
+    return {
+        name: {
+            "gene": {gene: float(genes[person, gene]) for gene in (2, 1, 0)},
+            "trait": {True: float(traits[person]), False: float(1 - traits[person])}
+        }
+        for person, name in enumerate(names)
+    }
+
+
+# Inference methods available from the command line
+METHODS = {
+    "enumeration": enumerate_probabilities,
+    "vectorized": vectorized_probabilities
+}
+
+
 if __name__ == "__main__":
     main()
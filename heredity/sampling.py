@@ -0,0 +1,383 @@
+import argparse
+import multiprocessing
+import time
+
+import numpy
+
+from heredity import encode_people, load_data, parents_first, print_probabilities, probability_tables, to_probabilities
+
+# Approximate inference methods, and their names
+LIKELIHOOD = "likelihood"
+GIBBS = "gibbs"
+NAMES = {
+    LIKELIHOOD: "Likelihood weighting",
+    GIBBS: "Gibbs sampling"
+}
+
+# Independent samples drawn at once by each chain's process for likelihood weighting
+SAMPLES = 256
+# Walkers sweeping in lockstep in each chain's process for Gibbs sampling,
+# sweeps per round, and sweeps discarded before counting samples
+WALKERS = 32
+SWEEPS = 50
+BURN_IN = 100
+# Potential scale reduction (R-hat) below which Gibbs chains are considered mixed
+RHAT_THRESHOLD = 1.01
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Approximate gene and trait probabilities of a family by sampling.")
+    parser.add_argument("data", help="CSV file of the family")
+    parser.add_argument("-m", "--method", choices=[LIKELIHOOD, GIBBS], default=GIBBS, help="sampling method")
+    parser.add_argument("-c", "--chains", type=int, default=max(2, multiprocessing.cpu_count()),
+                        help="number of chains, each sampled in its own process")
+    parser.add_argument("-e", "--error", type=float, default=0.005,
+                        help="target standard error of gene probabilities")
+    parser.add_argument("-t", "--seconds", type=float, default=10, help="time budget (in seconds)")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    people = load_data(args.data)
+    probabilities, diagnostics = sample_probabilities(
+        people, args.method, args.chains, args.error, args.seconds, args.seed
+    )
+
+    # Print results
+    print_probabilities(probabilities)
+    report(args.method, diagnostics)
+
+
+def sample_probabilities(people, method=GIBBS, chains=2, error=0.005, seconds=10, seed=0):
+    """
+    Return the gene and trait probability distributions of each person in `people`
+    (in the format of `heredity.main`) approximated by `method` sampling
+    across `chains` worker processes, and a dictionary of convergence diagnostics.
+
+    Chains are sampled in rounds, until the standard error of every gene
+    probability is below `error` (and, for Gibbs sampling, chains have mixed),
+    or until `seconds` seconds have passed.
+    """
+    names, mothers, fathers, traits = encode_people(people)
+    index = {name: person for person, name in enumerate(names)}
+    pedigree = Pedigree(mothers, fathers, traits, [index[name] for name in parents_first(people)])
+
+    start = time.perf_counter()
+    states = [None] * chains
+    totals = None
+    rounds = 0
+    with multiprocessing.Pool(chains) as pool:
+        while True:
+            jobs = [(pedigree, method, states[chain], [seed, rounds, chain]) for chain in range(chains)]
+            results = pool.map(sample_chain, jobs)
+            states = [state for _, state in results]
+            rounds += 1
+
+            # Add each chain's statistics to its totals (Gibbs burn-in rounds are discarded).
+            if method == GIBBS and rounds * SWEEPS <= BURN_IN:
+                continue
+            statistics = [statistics for statistics, _ in results]
+            if totals is None:
+                totals = statistics
+            else:
+                totals = [merge(total, new) for total, new in zip(totals, statistics)]
+
+            genes, have_trait, diagnostics = estimate(method, totals)
+            elapsed = time.perf_counter() - start
+            converged = diagnostics["error"] <= error and diagnostics.get("rhat", 1) <= RHAT_THRESHOLD
+            if converged or elapsed >= seconds:
+                break
+
+    diagnostics.update(rounds=rounds, seconds=elapsed, converged=converged)
+
+    # Observed traits are certain.
+    have_trait = numpy.where(traits == 2, have_trait, traits)
+
+    return to_probabilities(names, genes, have_trait), diagnostics
+
+
+def sample_chain(job):
+    """
+    Sample one round of a chain, given the chain's `pedigree`, sampling `method`,
+    `state` (the walkers of a Gibbs chain, None for a new chain)
+    and seed, and return the round's statistics and the chain's new state.
+    """
+    pedigree, method, state, seed = job
+    rng = numpy.random.default_rng(seed)
+
+    if method == LIKELIHOOD:
+        return pedigree.likelihood_weighting(rng, SAMPLES), None
+
+    if state is None:
+        state = pedigree.forward_sample(rng, WALKERS)[0]
+    return pedigree.gibbs(rng, state, SWEEPS)
+
+
+def merge(total, new):
+    """
+    Return the sum of a chain's `total` statistics and `new` statistics,
+    rescaling weighted sums relative to the larger of their weights' offsets.
+    """
+    if "offset" not in total:
+        return {key: total[key] + new[key] for key in total}
+
+    offset = max(total["offset"], new["offset"])
+    merged = {"samples": total["samples"] + new["samples"], "offset": offset}
+    for key in ("weights", "genes", "trait", "squared_weights", "squared_genes"):
+        power = 2 if key.startswith("squared") else 1
+        merged[key] = (
+            total[key] * numpy.exp(power * (total["offset"] - offset)) +
+            new[key] * numpy.exp(power * (new["offset"] - offset))
+        )
+
+    return merged
+
+
+def estimate(method, totals):
+    """
+    Return the gene count probabilities and trait probabilities estimated from
+    every chain's `totals`, and a dictionary of diagnostics: the number of samples,
+    the largest standard error of gene probabilities, and the effective number
+    of samples (likelihood weighting) or the largest R-hat (Gibbs sampling).
+    """
+    if method == LIKELIHOOD:
+        # Chains are independent samples: merge them into weighted sums.
+        merged = totals[0]
+        for total in totals[1:]:
+            merged = merge(merged, total)
+        weights = merged["weights"]
+        squared_weights = merged["squared_weights"]
+        genes_sum = merged["genes"]
+        squared_genes_sum = merged["squared_genes"]
+        trait_sum = merged["trait"]
+        samples = merged["samples"]
+        if weights == 0:
+            raise Exception("Every sample contradicts the observed traits.")
+
+        genes = genes_sum / weights
+        effective_samples = weights ** 2 / squared_weights
+        # Standard error of weighted means of gene indicators (by the delta method),
+        # and at least that of as many independent samples as the effective samples
+        # (smoothing probabilities, which may all be 0 or 1 when few samples carry the weight).
+        variance = (squared_genes_sum * (1 - 2 * genes) + genes ** 2 * squared_weights) / weights ** 2
+        smoothed = (genes * effective_samples + 1) / (effective_samples + 2)
+        variance = numpy.maximum(variance, smoothed * (1 - smoothed) / effective_samples)
+        diagnostics = {
+            "samples": samples,
+            "error": float(numpy.sqrt(variance).max()),
+            "effective_samples": float(effective_samples)
+        }
+        return genes, trait_sum / weights, diagnostics
+
+    # Every walker of every chain is a Markov chain of its own.
+    counts = numpy.concatenate([total["genes"] for total in totals])
+    trait_sums = numpy.concatenate([total["trait"] for total in totals])
+    samples = totals[0]["samples"]
+    means = counts / samples
+    chains = len(means)
+
+    # Standard error of gene probabilities, from the spread of chains' estimates.
+    error = means.std(axis=0, ddof=1) / numpy.sqrt(chains)
+
+    # R-hat of each person's gene count, comparing variance between and within chains.
+    gene_counts = numpy.arange(3)
+    chain_means = means @ gene_counts
+    within = (means @ gene_counts ** 2 - chain_means ** 2).mean(axis=0) * samples / max(samples - 1, 1)
+    between = chain_means.var(axis=0, ddof=1) * samples
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        rhat = numpy.sqrt(((samples - 1) / samples * within + between / samples) / within)
+
+    diagnostics = {
+        "samples": samples * chains,
+        "error": float(error.max()),
+        "rhat": float(numpy.nanmax(rhat)) if numpy.isfinite(rhat).any() else 1.0
+    }
+    return means.mean(axis=0), trait_sums.mean(axis=0) / samples, diagnostics
+
+
+def report(method, diagnostics):
+    """
+    Print the diagnostics of a sampling run.
+    """
+    print(f"{NAMES[method]}: {diagnostics['samples']} samples, {diagnostics['rounds']} rounds, "
+          f"{diagnostics['seconds']:.2f}s ({'converged' if diagnostics['converged'] else 'time budget exhausted'})")
+    print(f"  Largest standard error: {diagnostics['error']:.5f}")
+    if "rhat" in diagnostics:
+        print(f"  Largest R-hat: {diagnostics['rhat']:.4f}")
+    if "effective_samples" in diagnostics:
+        print(f"  Effective samples: {diagnostics['effective_samples']:.0f}")
+
+
+class Pedigree():
+    """
+    Family whose genes are sampled: each person's parents (-1 for none) and trait
+    (as encoded by `heredity.encode_people`), and the `order` of people with parents first.
+
+    For Gibbs sampling, people are split in classes of people sharing no factor
+    (neither parent and child, nor parents of the same child): given everyone
+    else, the gene counts of a class are independent, so they are resampled at once.
+    """
+
+    def __init__(self, mothers, fathers, traits, order):
+        self.mothers = mothers
+        self.fathers = fathers
+        self.traits = traits
+        self.order = order
+        self.prior, self.inheritance, trait_table = probability_tables()
+        # Probability of each person's trait given gene counts (1 if the trait is not observed).
+        self.likelihood = numpy.column_stack([trait_table, numpy.ones(3)])[:, traits].T
+        self.have_trait = trait_table[:, 1]
+
+        # Logarithms of the tables, and of the probability of a child's gene count
+        # given their parents, indexed by the other parent's and the child's gene counts.
+        with numpy.errstate(divide="ignore"):
+            self.log_prior = numpy.log(self.prior)
+            self.log_inheritance = numpy.log(self.inheritance)
+            self.log_likelihood = numpy.log(self.likelihood)
+        self.log_as_mother = self.log_inheritance.transpose(1, 2, 0)
+        self.log_as_father = self.log_inheritance.transpose(0, 2, 1)
+
+        # Each person's children (with the other parent of each), and neighbours.
+        n = len(traits)
+        children = [[] for _ in range(n)]
+        neighbours = [set() for _ in range(n)]
+        for child in range(n):
+            if mothers[child] >= 0:
+                mother, father = int(mothers[child]), int(fathers[child])
+                children[mother].append((child, father, True))
+                children[father].append((child, mother, False))
+                for first, second in ((child, mother), (child, father), (mother, father)):
+                    neighbours[first].add(second)
+                    neighbours[second].add(first)
+
+        # Greedily color people so that neighbours have different colors.
+        colors = [-1] * n
+        for person in order:
+            used = {colors[neighbour] for neighbour in neighbours[person]}
+            colors[person] = next(color for color in range(n + 1) if color not in used)
+
+        self.classes = []
+        for color in range(max(colors, default=-1) + 1):
+            people = numpy.array([person for person in order if colors[person] == color])
+            relations = [
+                (k, child, other, is_mother)
+                for k, person in enumerate(people) for child, other, is_mother in children[person]
+            ]
+            positions, relatives, others, is_mother = (numpy.array(column) for column in zip(*relations)) \
+                if relations else (numpy.zeros(0, dtype=numpy.int64),) * 4
+            parents = mothers[people] >= 0
+            self.classes.append({
+                "people": people,
+                "parents": parents,
+                "mothers": numpy.where(parents, mothers[people], 0),
+                "fathers": numpy.where(parents, fathers[people], 0),
+                # Children of the class's people, sorted by person, and where each person's start.
+                "children": relatives,
+                "others": others,
+                "is_mother": is_mother.astype(bool)[:, None],
+                "with_children": numpy.unique(positions),
+                "starts": numpy.searchsorted(positions, numpy.unique(positions))
+            })
+
+    def forward_sample(self, rng, walkers):
+        """
+        Return `walkers` gene configurations (one per row) sampled from the
+        genes' distribution ignoring traits, and the logarithm of the likelihood
+        of each configuration's observed traits.
+        """
+        genes = numpy.zeros((walkers, len(self.traits)), dtype=numpy.int64)
+        log_weights = numpy.zeros(walkers)
+
+        for person in self.order:
+            if self.mothers[person] < 0:
+                probabilities = numpy.broadcast_to(self.prior, (walkers, 3))
+            else:
+                probabilities = self.inheritance[genes[:, self.mothers[person]], genes[:, self.fathers[person]]]
+            genes[:, person] = choose(rng, probabilities)
+            log_weights += self.log_likelihood[person, genes[:, person]]
+
+        return genes, log_weights
+
+    def likelihood_weighting(self, rng, samples):
+        """
+        Return the statistics of `samples` gene configurations sampled ignoring
+        traits and weighted by the likelihood of observed traits.
+        Weights are relative to the largest weight, whose logarithm is `offset`,
+        so that the likelihoods of many traits do not underflow.
+        """
+        genes, log_weights = self.forward_sample(rng, samples)
+        n = genes.shape[1]
+        offset = log_weights.max()
+        weights = numpy.exp(log_weights - offset)
+
+        # Weighted sums of gene count indicators, and of trait probabilities.
+        indexes = (genes + 3 * numpy.arange(n)).ravel()
+        genes_sum = numpy.bincount(indexes, weights=numpy.repeat(weights, n), minlength=3 * n)
+        squared_genes_sum = numpy.bincount(indexes, weights=numpy.repeat(weights ** 2, n), minlength=3 * n)
+
+        return {
+            "samples": samples,
+            "offset": offset,
+            "weights": weights.sum(),
+            "squared_weights": (weights ** 2).sum(),
+            "genes": genes_sum.reshape(n, 3),
+            "squared_genes": squared_genes_sum.reshape(n, 3),
+            "trait": weights @ self.have_trait[genes]
+        }
+
+    def gibbs(self, rng, genes, sweeps):
+        """
+        Resample the gene counts of each class of people of each walker of `genes`,
+        given everyone else's, `sweeps` times, and return the statistics of
+        the configurations visited after each sweep and the walkers' final configurations.
+        """
+        walkers, n = genes.shape
+        counts = numpy.zeros((walkers, n, 3))
+        trait_sum = numpy.zeros((walkers, n))
+        walker_indexes = numpy.arange(walkers)[:, None]
+        people = numpy.arange(n)
+
+        for _ in range(sweeps):
+            for group in self.classes:
+                # Probability of the people's gene counts given their parents and traits...
+                log_probabilities = numpy.where(
+                    group["parents"][:, None],
+                    self.log_inheritance[genes[:, group["mothers"]], genes[:, group["fathers"]]],
+                    self.log_prior
+                ) + self.log_likelihood[group["people"]]
+
+                # ...times the probability of their children's gene counts given them.
+                if len(group["children"]):
+                    others = genes[:, group["others"]]
+                    relatives = genes[:, group["children"]]
+                    log_children = numpy.where(
+                        group["is_mother"],
+                        self.log_as_mother[others, relatives],
+                        self.log_as_father[others, relatives]
+                    )
+                    log_probabilities[:, group["with_children"]] += numpy.add.reduceat(
+                        log_children, group["starts"], axis=1
+                    )
+
+                probabilities = numpy.exp(log_probabilities - log_probabilities.max(axis=2, keepdims=True))
+                genes[:, group["people"]] = choose(rng, probabilities.reshape(-1, 3)).reshape(walkers, -1)
+
+            counts[walker_indexes, people, genes] += 1
+            trait_sum += self.have_trait[genes]
+
+        statistics = {"samples": sweeps, "genes": counts, "trait": trait_sum}
+        return statistics, genes
+
+
+def choose(rng, probabilities):
+    """
+    Return a column index sampled from each row of `probabilities`
+    (proportional to its values).
+    """
+    cumulative = probabilities.cumsum(axis=1)
+    thresholds = rng.random(len(cumulative)) * cumulative[:, -1]
+
+    return numpy.minimum((cumulative < thresholds[:, None]).sum(axis=1), probabilities.shape[1] - 1)
+
+
+if __name__ == "__main__":
+    main()
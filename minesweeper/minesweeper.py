@@ -1,6 +1,8 @@
-import copy
-import itertools as it
+import math
 import random
+from collections import deque
+
+import numpy
 
 
 class Minesweeper:
@@ -16,20 +18,24 @@ class Minesweeper:
         self.mines = set()
 
         # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        # (the board is a bitset: bit `i * width + j` is set if cell (i, j) is a mine)
+        self.board = 0
 
         # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        mines_grid = numpy.zeros((height, width), dtype=numpy.int8)
+        for index in random.sample(range(height * width), mines):
+            self.mines.add(divmod(index, width))
+            self.board |= 1 << index
+            mines_grid.flat[index] = 1
+
+        # Precompute the number of nearby mines of every cell, convolving the mines grid
+        # with a 3x3 kernel (the sum of the 9 shifted windows of the zero-padded grid),
+        # not counting the cell itself.
+        padded = numpy.pad(mines_grid, 1)
+        self.counts = sum(
+            padded[i:i + height, j:j + width]
+            for i in range(3) for j in range(3)
+        ) - mines_grid
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -42,7 +48,7 @@ class Minesweeper:
         for i in range(self.height):
             print("--" * self.width + "-")
             for j in range(self.width):
-                if self.board[i][j]:
+                if self.is_mine((i, j)):
                     print("|X", end="")
                 else:
                     print("| ", end="")
@@ -51,7 +57,7 @@ class Minesweeper:
 
     def is_mine(self, cell):
         i, j = cell
-        return self.board[i][j]
+        return bool(self.board >> (i * self.width + j) & 1)
 
     def nearby_mines(self, cell):
         """
@@ -59,24 +65,31 @@ class Minesweeper:
         within one row and column of a given cell,
         not including the cell itself.
         """
+        return int(self.counts[cell])
 
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
+    def reveal(self, cell, revealed=()):
+        """
+        Returns the set of cells revealed by playing a given safe cell:
+        the cell itself and, if it has no nearby mines, flood-filling its region
+        of cells with no nearby mines along with the region's border.
+        Cells in `revealed` (already revealed) are neither returned nor expanded.
+        """
+        cells = {cell}
+        queue = deque([cell])
 
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
+        while queue:
+            i, j = queue.popleft()
+            if self.counts[i, j]:
+                continue
+            # Cells next to a cell with no nearby mines can't be mines.
+            for row in range(max(i - 1, 0), min(i + 2, self.height)):
+                for column in range(max(j - 1, 0), min(j + 2, self.width)):
+                    neighbour = (row, column)
+                    if neighbour not in cells and neighbour not in revealed:
+                        cells.add(neighbour)
+                        queue.append(neighbour)
 
-        return count
+        return cells
 
     def won(self):
         """
@@ -90,46 +103,69 @@ class Sentence:
     Logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of the number of those cells which are mines.
+
+    The set of cells is a bitset, where bit `i * width + j` is set if cell (i, j) is in the sentence.
+    Sentences are hashed by their cells and count, so a sentence must be removed from
+    any set it is in before being changed (and added back afterwards).
     """
 
     def __init__(self, cells, count):
-        self.cells = set(cells)
+        self.cells = cells
         self.count = count
 
+        # Cached known mines and known safes, until the sentence changes
+        self.cached_mines = None
+        self.cached_safes = None
+
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self):
+        return hash((self.cells, self.count))
+
     def __str__(self):
-        return f"{self.cells} = {self.count}"
+        return f"{bit_indices(self.cells)} = {self.count}"
 
     def known_mines(self):
         """
-        Returns the set of all cells in self.cells known to be mines.
+        Returns the bitset of all cells in self.cells known to be mines.
         """
-        return self.cells if len(self.cells) == self.count else None
+        if self.cached_mines is None:
+            self.cached_mines = self.cells if self.cells.bit_count() == self.count else 0
+        return self.cached_mines
 
     def known_safes(self):
         """
-        Returns the set of all cells in self.cells known to be safe.
+        Returns the bitset of all cells in self.cells known to be safe.
         """
-        return self.cells if self.count == 0 else None
+        if self.cached_safes is None:
+            self.cached_safes = self.cells if self.count == 0 else 0
+        return self.cached_safes
 
-    def mark_mine(self, cell):
+    def mark_mine(self, cells):
         """
         Updates internal knowledge representation given the fact that
-        a cell is known to be a mine.
+        the cells in the bitset `cells` are known to be mines.
+        Returns True if the sentence changed.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
-            self.count -= 1
-
-    def mark_safe(self, cell):
+        mines = self.cells & cells
+        if mines:
+            self.cells ^= mines
+            self.count -= mines.bit_count()
+            self.cached_mines = self.cached_safes = None
+        return bool(mines)
+
+    def mark_safe(self, cells):
         """
         Updates internal knowledge representation given the fact that
-        a cell is known to be safe.
+        the cells in the bitset `cells` are known to be safe.
+        Returns True if the sentence changed.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
+        safes = self.cells & cells
+        if safes:
+            self.cells ^= safes
+            self.cached_mines = self.cached_safes = None
+        return bool(safes)
 
 
 class MinesweeperAI:
@@ -137,109 +173,241 @@ class MinesweeperAI:
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    # Inference modes: pairwise subset inference, or Gaussian elimination on the sentences.
+    SUBSET = "subset"
+    LINEAR = "linear"
+
+    def __init__(self, height=8, width=8, solver=SUBSET):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
-        # Keep track of which cells have been clicked on
-        self.moves_made = set()
+        # Set inference mode
+        if solver not in (MinesweeperAI.SUBSET, MinesweeperAI.LINEAR):
+            raise Exception("Invalid solver")
+        self.solver = solver
 
-        # Keep track of cells known to be safe or mines
-        self.mines = set()
-        self.safes = set()
+        # Bitset with a bit set for every cell of the board
+        self.board = (1 << (height * width)) - 1
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Keep track of which cells have been clicked on (as a bitset)
+        self.moves_made = 0
 
-    def mark_mine(self, cell):
+        # Keep track of cells known to be safe or mines (as bitsets)
+        self.mines = 0
+        self.safes = 0
+
+        # Set of sentences about the game known to be true
+        self.knowledge = set()
+
+    def cell_bit(self, cell):
         """
-        Marks a cell as a mine, and updates all knowledge
-        to mark that cell as a mine as well.
+        Returns the bitset containing only the given (row, column) cell.
         """
-        self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        return 1 << (cell[0] * self.width + cell[1])
 
-    def mark_safe(self, cell):
+    def cells(self, bitset):
         """
-        Marks a cell as safe, and updates all knowledge
-        to mark that cell as safe as well.
+        Returns the set of (row, column) cells contained in a bitset,
+        e.g. `ai.cells(ai.mines)` for the cells known to be mines.
         """
-        self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        return {divmod(index, self.width) for index in bit_indices(bitset)}
+
+    def mark_mine(self, cells):
+        """
+        Marks the cells in the bitset `cells` as mines, and updates all knowledge
+        to mark those cells as mines as well.
+        Returns the list of sentences that changed.
+        """
+        self.mines |= cells
+        changed = self.remove_sentences(cells)
+        for sentence in changed:
+            sentence.mark_mine(cells)
+        self.knowledge.update(changed)
+
+        return changed
+
+    def mark_safe(self, cells):
+        """
+        Marks the cells in the bitset `cells` as safe, and updates all knowledge
+        to mark those cells as safe as well.
+        Returns the list of sentences that changed.
+        """
+        self.safes |= cells
+        changed = self.remove_sentences(cells)
+        for sentence in changed:
+            sentence.mark_safe(cells)
+        self.knowledge.update(changed)
+
+        return changed
+
+    def remove_sentences(self, cells):
+        """
+        Removes from the KB (so they can be changed) and returns the list of sentences
+        containing any of the cells in the bitset `cells`.
+        """
+        sentences = [sentence for sentence in self.knowledge if sentence.cells & cells]
+        self.knowledge.difference_update(sentences)
+
+        return sentences
 
     def neighbour_cells(self, cell, count):
         """
-        For all the cell's neighbours, it checks if the neighbour is the cell itself, if it's
-        a known safe cell or a known mine cell and if not it adds it to the neighbour cells set,
-        also updating the mines count if necessary.
+        Returns the bitset of the cell's neighbours which are neither the cell itself,
+        a known safe cell nor a known mine cell, also updating the mines count
+        for the known mines among the neighbours.
+        """
+        neighbours = neighbour_mask(cell, self.height, self.width) & ~self.cell_bit(cell) & ~self.safes
+        count -= (neighbours & self.mines).bit_count()
+
+        return neighbours & ~self.mines, count
+
+    def cleanup_knowledge(self):
+        """
+        Marks the cells of every sentence in the KB known to be safes or known to be mines,
+        until no more cells can be concluded, and removes the empty sentences from the KB.
+        Returns the list of sentences that changed along the way.
+        """
+        changed = []
+
+        while True:
+            safes = 0
+            mines = 0
+            for sentence in self.knowledge:
+                safes |= sentence.known_safes()
+                mines |= sentence.known_mines()
+
+            # Only the cells we didn't know about yet are new knowledge.
+            safes &= ~self.safes
+            mines &= ~self.mines
+            if not safes and not mines:
+                break
+
+            changed += self.mark_safe(safes)
+            changed += self.mark_mine(mines)
+
+        # Every empty sentence is the same `{} = 0` sentence.
+        self.knowledge.discard(Sentence(0, 0))
+
+        return changed
+
+    def infer_new_sentences(self, sentences):
+        """
+        Compares each of the given (new or changed) sentences with every sentence in the KB,
+        determining if either is a subset of the other.
+        If that's the case, it creates a new sentence removing the subset's cells from the superset's
+        and subtracting the subset's count from the superset's.
+        If the new sentence is not empty and is not already in the KB, it will be added to the KB itself,
+        and compared in turn with the rest of the KB.
+        KB will then be checked again and cleaned up if necessary, and any sentence changed by the
+        cleanup will be compared again as well.
         """
-        cells = set()
+        pending = list(sentences)
+
+        while True:
+            pending += self.cleanup_knowledge()
+            if not pending:
+                break
 
-        for row in range(cell[0] - 1, cell[0] + 2):
-            for column in range(cell[1] - 1, cell[1] + 2):
-                neighbour = (row, column)
+            sentence = pending.pop()
+            if not sentence.cells:
+                continue
 
-                if neighbour == cell or neighbour in self.safes:
+            new_sentences = set()
+            for other in self.knowledge:
+                if other is sentence or not other.cells & sentence.cells:
                     continue
-                if neighbour in self.mines:
-                    count -= 1
+                # Subset tests and differences are bitwise operations on the cells' bitsets.
+                if not sentence.cells & ~other.cells:
+                    new_sentence = Sentence(other.cells & ~sentence.cells, other.count - sentence.count)
+                elif not other.cells & ~sentence.cells:
+                    new_sentence = Sentence(sentence.cells & ~other.cells, sentence.count - other.count)
+                else:
                     continue
-                if 0 <= row < self.height and 0 <= column < self.width:
-                    cells.add(neighbour)
 
-        return cells, count
+                if new_sentence.cells and new_sentence not in self.knowledge:
+                    new_sentences.add(new_sentence)
+
+            self.knowledge.update(new_sentences)
+            pending += new_sentences
 
-    def cleanup_knowledge(self, knowledge):
+    def components(self):
         """
-        For each sentence in the KB, it makes a copy of the sentence's cells and checks
-        if they're either empty, known to be safes or known to be mines, updating the AI with this
-        new knowledge and removing the sentence from the KB.
+        Splits the KB into groups of sentences sharing cells (directly or through
+        other sentences), as no deduction can combine sentences of different groups.
+        Returns a list of (cells bitset, list of sentences) pairs.
         """
+        components = []
+
         for sentence in self.knowledge:
-            sentence_cells = copy.deepcopy(sentence.cells)
-
-            if sentence_cells == set():
-                self.knowledge.remove(sentence)
-
-            if sentence.known_safes() and sentence_cells == sentence.known_safes():
-                for cell in sentence_cells:
-                    self.mark_safe(cell)
-                self.knowledge.remove(sentence)
-
-            if sentence.known_mines() and sentence_cells == sentence.known_mines():
-                for cell in sentence_cells:
-                    self.mark_mine(cell)
-                self.knowledge.remove(sentence)
-
-    def infer_new_sentences(self, knowledge):
-        """
-        Compares every possible permutation of (2) sentences, determining is the first is a subset of the second.
-        If that's the case, it creates new cells removing the 1st sentence's cells from the 2nd and subtracting
-        the 1st sentence's count from the 2nd (first checking if the sentences are the same and removing one of them if so).
-        If the new sentence exists and is not already in the KB, it will be added to the KB itself.
-        KB will then checked again and cleaned up if necessary.
-        (https://docs.python.org/3/library/itertools.html#itertools.permutations)
-        """
-        for sentence1, sentence2 in it.permutations(self.knowledge, 2):
-            if sentence1 == sentence2 and sentence2.cells:
-                self.knowledge.remove(sentence2)
-                self.cleanup_knowledge(self.knowledge)
-                continue
-            if sentence1.cells and sentence2.cells:
-                if sentence1.cells.issubset(sentence2.cells):
-                    new_cells = sentence2.cells - sentence1.cells
-                    new_count = sentence2.count - sentence1.count
+            cells = sentence.cells
+            sentences = [sentence]
+            separate = []
+            for component in components:
+                if component[0] & cells:
+                    cells |= component[0]
+                    sentences += component[1]
+                else:
+                    separate.append(component)
+            components = separate + [(cells, sentences)]
 
-                    new_sentence = Sentence(new_cells, new_count)
+        return components
 
-                    if new_sentence.cells and new_sentence not in self.knowledge:
-                        self.knowledge.append(new_sentence)
+    def solve_linear(self, sentences):
+        """
+        Writes each group of sentences sharing cells with the given (new or changed) sentences
+        as a system of linear equations (one row per sentence, one 0/1 column per cell,
+        the mines count as the constant term) and reduces it with exact (integer) Gaussian elimination.
+        Since every cell is either 0 (safe) or 1 (mine), a reduced equation whose constant
+        term equals the lowest (or highest) value its left-hand side can take determines all
+        of its cells at once.
+        Marks the cells found, cleaning up the KB, and solves again the groups changed by
+        that until no more cells can be concluded.
+        """
+        changed = 0
+        for sentence in sentences:
+            changed |= sentence.cells
 
-                    self.cleanup_knowledge(self.knowledge)
+        while changed:
+            safes = 0
+            mines = 0
+
+            for cells, sentences in self.components():
+                # Groups that didn't change since they were last solved can't tell us anything new.
+                if not cells & changed:
+                    continue
+
+                columns = bit_indices(cells)
+                position = {index: column for column, index in enumerate(columns)}
+
+                equations = numpy.zeros((len(sentences), len(columns) + 1), dtype=numpy.int64)
+                for row, sentence in enumerate(sentences):
+                    equations[row, [position[index] for index in bit_indices(sentence.cells)]] = 1
+                    equations[row, -1] = sentence.count
+
+                for row in reduce_equations(equations):
+                    coefficients, count = row[:-1], row[-1]
+                    positive = coefficients > 0
+                    negative = coefficients < 0
+                    lowest = coefficients[negative].sum()
+                    highest = coefficients[positive].sum()
+
+                    if count == lowest:
+                        safe_columns, mine_columns = positive, negative
+                    elif count == highest:
+                        safe_columns, mine_columns = negative, positive
+                    else:
+                        continue
+
+                    for column in numpy.flatnonzero(safe_columns):
+                        safes |= 1 << columns[column]
+                    for column in numpy.flatnonzero(mine_columns):
+                        mines |= 1 << columns[column]
+
+            changed = 0
+            for sentence in self.mark_safe(safes) + self.mark_mine(mines) + self.cleanup_knowledge():
+                changed |= sentence.cells
 
     def add_knowledge(self, cell, count):
         """
@@ -256,23 +424,22 @@ class MinesweeperAI:
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
         """
-        self.moves_made.add(cell)
-        self.safes.add(cell)
+        bit = self.cell_bit(cell)
+        self.moves_made |= bit
+        changed = self.mark_safe(bit)
 
         cells, updated_count = self.neighbour_cells(cell, count)
         sentence = Sentence(cells, updated_count)
 
-        for cell in self.safes:
-            sentence.mark_safe(cell)
-        for cell in self.mines:
-            sentence.mark_mine(cell)
-
         if sentence.cells and sentence not in self.knowledge:
-            self.knowledge.append(sentence)
+            self.knowledge.add(sentence)
+            changed.append(sentence)
 
-        self.cleanup_knowledge(self.knowledge)
-
-        self.infer_new_sentences(self.knowledge)
+        if self.solver == MinesweeperAI.LINEAR:
+            changed += self.cleanup_knowledge()
+            self.solve_linear(changed)
+        else:
+            self.infer_new_sentences(changed)
 
     def make_safe_move(self):
         """
@@ -283,12 +450,9 @@ class MinesweeperAI:
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        safes_copy = copy.deepcopy(self.safes)
-        moves_made_copy = copy.deepcopy(self.moves_made)
-
-        safe_moves = safes_copy - moves_made_copy
+        safe_moves = self.safes & ~self.moves_made
 
-        return None if not safe_moves else random.sample(safe_moves, 1)[0]
+        return None if not safe_moves else divmod(random_bit(safe_moves), self.width)
 
     def make_random_move(self):
         """
@@ -297,10 +461,87 @@ class MinesweeperAI:
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        board = set((row, column) for row in range(self.height) for column in range(self.width))
-        mines = copy.deepcopy(self.mines)
-        moves_made = copy.deepcopy(self.moves_made)
+        random_moves = self.board & ~self.moves_made & ~self.mines
+
+        return None if not random_moves else divmod(random_bit(random_moves), self.width)
+
+
+def reduce_equations(equations):
+    """
+    Reduces a matrix of integer linear equations (one per row, constant terms in the last column)
+    to reduced row echelon form with fraction-free Gauss-Jordan elimination: rows are only
+    combined with integer multiples of each other (as Python integers, which can't overflow)
+    and divided by the greatest common divisor of their entries, so the result is exact.
+    Returns the non-zero rows of the reduced matrix, scaled to integer entries.
+    """
+    equations = equations.astype(object)
+    rows, columns = equations.shape
+    row = 0
+
+    for column in range(columns - 1):
+        if row == rows:
+            break
+        candidates = numpy.flatnonzero(equations[row:, column])
+        if not len(candidates):
+            continue
+
+        pivot = row + candidates[0]
+        equations[[row, pivot]] = equations[[pivot, row]]
+        # Eliminate the column from every other row, scaling the row by the pivot instead of dividing.
+        others = numpy.flatnonzero(equations[:, column])
+        others = others[others != row]
+        equations[others] = (equations[others] * equations[row, column]
+                             - numpy.outer(equations[others, column], equations[row]))
+        for other in others:
+            divisor = math.gcd(*equations[other])
+            if divisor > 1:
+                equations[other] //= divisor
+        row += 1
+
+    return equations[:row]
+
+
+def neighbour_mask(cell, height, width):
+    """
+    Returns the bitset of all the cells within one row and column
+    of a given cell (including the cell itself) on a `height` x `width` board.
+    """
+    i, j = cell
+    first = max(j - 1, 0)
+    row = (1 << (min(j + 1, width - 1) - first + 1)) - 1
 
-        random_moves = board - moves_made - mines
+    mask = 0
+    for r in range(max(i - 1, 0), min(i + 1, height - 1) + 1):
+        mask |= row << (r * width + first)
 
-        return None if not random_moves else random.sample(random_moves, 1)[0]
+    return mask
+
+
+def bit_indices(bitset):
+    """
+    Returns the (ascending) list of indices of the bits set in a bitset.
+    """
+    bits = bin(bitset)[:1:-1]
+    indices = []
+    index = bits.find("1")
+    while index != -1:
+        indices.append(index)
+        index = bits.find("1", index + 1)
+
+    return indices
+
+
+def random_bit(bitset):
+    """
+    Returns the index of a bit chosen at random among the bits set in a (non empty) bitset.
+    """
+    size = bitset.bit_length()
+    # When the bitset is dense enough, just try random bits until we find one that is set,
+    # otherwise pick one from the list of set bits.
+    if bitset.bit_count() * 4 >= size:
+        while True:
+            index = random.randrange(size)
+            if bitset >> index & 1:
+                return index
+
+    return random.choice(bit_indices(bitset))
@@ -184,7 +184,7 @@ while True:
             if move is None:
                 move = ai.make_random_move()
                 if move is None:
-                    flags = ai.mines.copy()
+                    flags = ai.cells(ai.mines)
                     print("No moves left to make.")
                 else:
                     print("No known safe moves, AI making random move.")
@@ -215,8 +215,8 @@ while True:
         if game.is_mine(move):
             lost = True
         else:
-            nearby = game.nearby_mines(move)
-            revealed.add(move)
-            ai.add_knowledge(move, nearby)
+            for cell in game.reveal(move, revealed):
+                revealed.add(cell)
+                ai.add_knowledge(cell, game.nearby_mines(cell))
 
     pygame.display.flip()
@@ -0,0 +1,140 @@
+import argparse
+import multiprocessing
+import random
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+# Board presets: (height, width, mines)
+PRESETS = {
+    "beginner": (9, 9, 10),
+    "intermediate": (16, 16, 40),
+    "expert": (16, 30, 99),
+    "large": (50, 50, 400),
+    "huge": (100, 100, 1600)
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Minesweeper games with the AI, without a UI.")
+    parser.add_argument("preset", nargs="*", default=["beginner", "intermediate", "expert"],
+                        help=f"board presets to play ({', '.join(PRESETS)})")
+    parser.add_argument("-n", "--games", type=int, default=100, help="number of games per board")
+    parser.add_argument("--height", type=int, help="custom board height")
+    parser.add_argument("--width", type=int, help="custom board width")
+    parser.add_argument("--density", type=float, help="custom board mine density (between 0 and 1)")
+    parser.add_argument("-p", "--processes", type=int, default=multiprocessing.cpu_count(),
+                        help="number of worker processes")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--solver", choices=[MinesweeperAI.SUBSET, MinesweeperAI.LINEAR],
+                        default=MinesweeperAI.SUBSET, help="AI inference mode")
+    args = parser.parse_args()
+
+    # A custom board replaces the presets.
+    if args.height or args.width or args.density:
+        height = args.height or 16
+        width = args.width or 16
+        mines = round((args.density or 0.15) * height * width)
+        boards = {f"{height}x{width}": (height, width, mines)}
+    else:
+        unknown = [preset for preset in args.preset if preset not in PRESETS]
+        if unknown:
+            parser.error(f"unknown presets: {', '.join(unknown)}")
+        boards = {preset: PRESETS[preset] for preset in args.preset}
+
+    for name, (height, width, mines) in boards.items():
+        results = simulate(height, width, mines, args.games, args.processes, args.seed, args.solver)
+        report(f"{name}, {args.solver} solver", height, width, mines, results)
+
+
+def simulate(height, width, mines, games, processes, seed=0, solver=MinesweeperAI.SUBSET):
+    """
+    Play `games` games on a `height` x `width` board with `mines` mines,
+    across `processes` worker processes, with the AI using the `solver` inference mode.
+    Game `k` is played with its RNG seeded with `seed + k`, so results are
+    reproducible regardless of the number of processes.
+
+    Return a dictionary with the number of games won, the total number of moves,
+    the wall-clock time and the list of every move's latency (in seconds).
+    """
+    jobs = [(height, width, mines, seed + game, solver) for game in range(games)]
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        played = pool.map(play_game, jobs, chunksize=max(1, games // (processes * 4)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "won": sum(won for won, _ in played),
+        "games": games,
+        "moves": sum(len(latencies) for _, latencies in played),
+        "seconds": elapsed,
+        "latencies": [latency for _, latencies in played for latency in latencies]
+    }
+
+
+def play_game(job):
+    """
+    Play a single game with the AI, as the runner's "AI Move" button would
+    (revealing the whole region around cells with no nearby mines).
+    The game is won when every safe cell has been revealed.
+
+    Return whether the game was won, and the latency of every move
+    (choosing the move, revealing cells and adding the resulting knowledge).
+    """
+    height, width, mines, seed, solver = job
+    random.seed(seed)
+
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, solver=solver)
+
+    latencies = []
+    revealed = set()
+    safe_cells = height * width - mines
+
+    while len(revealed) < safe_cells:
+        start = time.perf_counter()
+
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+        if move is None or game.is_mine(move):
+            return False, latencies
+
+        for cell in game.reveal(move, revealed):
+            revealed.add(cell)
+            ai.add_knowledge(cell, game.nearby_mines(cell))
+
+        latencies.append(time.perf_counter() - start)
+
+    return True, latencies
+
+
+def report(name, height, width, mines, results):
+    """
+    Print win rate, moves per second and latency percentiles of a simulation.
+    """
+    latencies = sorted(results["latencies"])
+    moves = results["moves"]
+
+    print(f"{name} ({height}x{width}, {mines} mines), {results['games']} games:")
+    print(f"  Win rate: {results['won'] / results['games']:.2%}")
+    print(f"  Moves: {moves} ({moves / results['seconds']:.0f} moves/s)")
+    if latencies:
+        print(f"  Move latency: mean {sum(latencies) / moves * 1000:.3f} ms", end="")
+        for p in (50, 90, 99):
+            print(f", p{p} {percentile(latencies, p) * 1000:.3f} ms", end="")
+        print(f", max {latencies[-1] * 1000:.3f} ms")
+
+
+def percentile(values, p):
+    """
+    Return the `p`-th percentile of an ascending list of values (nearest rank).
+    """
+    index = max(0, min(len(values) - 1, round(p / 100 * len(values)) - 1))
+
+    return values[index]
+
+
+if __name__ == "__main__":
+    main()
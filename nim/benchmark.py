@@ -0,0 +1,43 @@
+import contextlib
+import io
+import multiprocessing
+import sys
+import time
+
+from nim import convergence, train, train_batch, train_parallel
+
+GAMES = 100000
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark.py [games]")
+    games = int(sys.argv[1]) if len(sys.argv) == 2 else GAMES
+
+    print(f"Training speed ({games} games)")
+
+    # Playing one game at a time is much slower, so time it on fewer games.
+    sequential = games // 100
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        train(sequential)
+    print(f"  train: {sequential / (time.perf_counter() - start):.0f} games/s")
+
+    start = time.perf_counter()
+    train_batch(games, report_every=0)
+    print(f"  train_batch: {games / (time.perf_counter() - start):.0f} games/s")
+
+    for workers in range(1, multiprocessing.cpu_count() + 1):
+        start = time.perf_counter()
+        train_parallel(games, workers=workers)
+        print(f"  train_parallel, {workers} workers: {games / (time.perf_counter() - start):.0f} games/s")
+
+    print()
+    print("Convergence to optimal play")
+    print("  Games    Optimal moves")
+    for played, rate in convergence(games // 10, seed=0):
+        print(f"  {played:<8} {rate:.2%}")
+
+
+if __name__ == "__main__":
+    main()
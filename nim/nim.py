@@ -1,37 +1,58 @@
+import functools
+import json
 import math
+import multiprocessing
+import operator
 import random
 import time
 import numpy
 
+# First bytes of the files NimAI models are saved to
+MODEL_MAGIC = b"NIMAI\x00"
+
 
 class Nim():
 
-    def __init__(self, initial=[1, 3, 5, 7]):
+    def __init__(self, initial=[1, 3, 5, 7], max_take=None):
         """
         Initialize game board.
         Each game board has
             - `piles`: a list of how many elements remain in each pile
             - `player`: 0 or 1 to indicate which player's turn
             - `winner`: None, 0, or 1 to indicate who the winner is
+
+        `max_take` can be set to cap how many items can be removed
+        from a pile in a single move.
         """
         self.piles = initial.copy()
+        self.max_take = max_take
         self.player = 0
         self.winner = None
 
     @classmethod
-    def available_actions(cls, piles):
+    def available_actions(cls, piles, max_take=None):
         """
         Nim.available_actions(piles) takes a `piles` list as input
-        and returns all of the available actions `(i, j)` in that state.
+        and returns the (frozen) set of all of the available actions `(i, j)` in that state.
 
         Action `(i, j)` represents the action of removing `j` items
-        from pile `i` (where piles are 0-indexed).
+        from pile `i` (where piles are 0-indexed), and `j` can be
+        capped to at most `max_take`.
         """
-        actions = set()
-        for i, pile in enumerate(piles):
-            for j in range(1, pile + 1):
-                actions.add((i, j))
-        return actions
+        return Nim.cached_actions(tuple(piles), max_take)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=65536)
+    def cached_actions(piles, max_take):
+        """
+        Return the frozen set of available actions for a `piles` tuple,
+        memoized as the same states are reached over and over.
+        """
+        return frozenset(
+            (i, j)
+            for i, pile in enumerate(piles)
+            for j in range(1, min(pile, max_take or pile) + 1)
+        )
 
     @classmethod
     def other_player(cls, player):
@@ -59,7 +80,7 @@ class Nim():
             raise Exception("Game already won")
         elif pile < 0 or pile >= len(self.piles):
             raise Exception("Invalid pile")
-        elif count < 1 or count > self.piles[pile]:
+        elif count < 1 or count > self.piles[pile] or (self.max_take and count > self.max_take):
             raise Exception("Invalid number of objects")
 
         # Update pile
@@ -71,22 +92,190 @@ class Nim():
             self.winner = self.player
 
 
+class NimTransitions():
+
+    # Transition tables already built, by initial piles and cap on items removed
+    tables = dict()
+
+    @classmethod
+    def of(cls, initial, max_take=None):
+        """
+        NimTransitions.of(initial, max_take) returns the transition table of games
+        starting from the `initial` piles (where at most `max_take` items can be
+        removed at once, if set), building it only the first time.
+        """
+        key = tuple(initial), max_take
+        if key not in cls.tables:
+            cls.tables[key] = cls(initial, max_take)
+        return cls.tables[key]
+
+    def __init__(self, initial, max_take=None):
+        """
+        Build the table of all the states of games starting from the
+        `initial` piles, and of the actions and transitions between them
+        (actions removing more than `max_take` items are never available, if set).
+
+        States are numbered with a mixed-radix encoding of their piles,
+        pile `i` being a digit in base `initial[i] + 1`, and actions `(i, j)`
+        are numbered pile by pile, from `(0, 1)` to `(len(initial) - 1, initial[-1])`.
+        The table has
+            - `piles`: the piles of every state
+            - `available`: for every (state, action) pair, whether the action is available
+            - `successors`: for every (state, action) pair, the state the action leads to
+              (-1 if the action isn't available)
+            - `indexes`: for every state, an array of its available actions' numbers
+        """
+        # Weight of each pile's digit in a state's number.
+        self.radix = [math.prod(pile + 1 for pile in initial[:i]) for i in range(len(initial))]
+        # Number of the first action `(i, 1)` of each pile.
+        self.offsets = [sum(initial[:i]) for i in range(len(initial))]
+        # Action `(i, j)` of every action number.
+        self.actions = [(i, j) for i, pile in enumerate(initial) for j in range(1, pile + 1)]
+        action_piles = numpy.array([i for i, _ in self.actions], dtype=int)
+        action_counts = numpy.array([j for _, j in self.actions], dtype=int)
+
+        states = numpy.arange(math.prod(pile + 1 for pile in initial))
+        radix = numpy.array(self.radix)
+        self.piles = (states[:, None] // radix % (numpy.array(initial) + 1)).tolist()
+        self.available = action_counts <= numpy.array(self.piles)[:, action_piles]
+        if max_take is not None:
+            self.available &= action_counts <= max_take
+        self.successors = numpy.where(self.available, states[:, None] - action_counts * radix[action_piles], -1)
+        self.indexes = [numpy.flatnonzero(row) for row in self.available]
+
+
 class NimAI():
 
-    def __init__(self, alpha=0.5, epsilon=0.1):
+    def __init__(self, alpha=0.5, epsilon=0.1, initial=[1, 3, 5, 7], max_take=None):
         """
-        Initialize AI with an empty Q-learning dictionary,
+        Initialize AI with an empty Q-learning table,
         an alpha (learning) rate, and an epsilon rate.
 
-        The Q-learning dictionary maps `(state, action)`
-        pairs to a Q-value (a number).
-         - `state` is a tuple of remaining piles, e.g. (1, 1, 4, 4)
+        The Q-learning table holds a Q-value (a number) for
+        every `(state, action)` pair of games starting from
+        the `initial` piles (where at most `max_take` items
+        can be removed at once, if set).
+         - `state` is a list of remaining piles, e.g. [1, 1, 4, 4]
          - `action` is a tuple `(i, j)` for an action
+
+        The table is a 2D array, with a row for each state
+        and a column for each action, numbered as in `NimTransitions`.
         """
-        self.q = dict()
+        self.initial = list(initial)
+        self.max_take = max_take
+
+        # States, actions and transitions between states, shared by every AI of the same game.
+        self.transitions = NimTransitions.of(initial, max_take)
+        self.radix = self.transitions.radix
+        self.offsets = self.transitions.offsets
+        self.actions = self.transitions.actions
+
+        self.q = numpy.zeros(self.transitions.available.shape)
+        # Number of updates of each Q-value.
+        self.visits = numpy.zeros(self.q.shape, dtype=numpy.int64)
         self.alpha = alpha
         self.epsilon = epsilon
 
+    def save(self, filename):
+        """
+        Save the AI to the file `filename`: a header describing the AI
+        (initial piles, cap on items removed, alpha and epsilon rates, and the table's layout)
+        followed by the raw Q-learning table, so it can be memory-mapped.
+        """
+        header = json.dumps({
+            "initial": self.initial,
+            "max_take": self.max_take,
+            "alpha": self.alpha,
+            "epsilon": self.epsilon,
+            "dtype": self.q.dtype.str,
+            "shape": self.q.shape
+        }).encode()
+        # Pad the header so the table starts at an aligned offset.
+        header += b" " * (-(len(MODEL_MAGIC) + 4 + len(header)) % 64)
+
+        with open(filename, "wb") as f:
+            f.write(MODEL_MAGIC)
+            f.write(len(header).to_bytes(4, "little"))
+            f.write(header)
+            f.write(numpy.ascontiguousarray(self.q).tobytes())
+
+    @classmethod
+    def load(cls, filename, mmap_mode="r"):
+        """
+        NimAI.load(filename) loads an AI saved with `save`.
+
+        By default, the Q-learning table is memory-mapped read-only (so
+        loading takes no time, and processes loading the same file share it);
+        `mmap_mode` can be set to "c" to allow training the AI further
+        (without changing the file), or to None to read the table into memory.
+        """
+        with open(filename, "rb") as f:
+            if f.read(len(MODEL_MAGIC)) != MODEL_MAGIC:
+                raise Exception("Invalid model file")
+            size = int.from_bytes(f.read(4), "little")
+            header = json.loads(f.read(size))
+            offset = f.tell()
+            dtype = numpy.dtype(header["dtype"])
+            shape = tuple(header["shape"])
+
+            if mmap_mode is None:
+                q = numpy.fromfile(f, dtype=dtype, count=math.prod(shape)).reshape(shape)
+            else:
+                q = numpy.memmap(f, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape)
+
+        ai = cls(alpha=header["alpha"], epsilon=header["epsilon"], initial=header["initial"],
+                 max_take=header.get("max_take"))
+        if q.shape != ai.q.shape:
+            raise Exception("Invalid model file")
+        ai.q = q
+
+        return ai
+
+    def state_index(self, state):
+        """
+        Return the row of the Q-learning table of the state `state`.
+        """
+        index = 0
+        for pile, initial, radix in zip(state, self.initial, self.radix):
+            if not 0 <= pile <= initial:
+                break
+            index += pile * radix
+        else:
+            if len(state) == len(self.initial):
+                return index
+        raise ValueError(f"State {list(state)} is not a state of games starting from {self.initial}")
+
+    def action_index(self, action):
+        """
+        Return the column of the Q-learning table of the action `action`.
+        """
+        i, j = action
+        return self.offsets[i] + j - 1
+
+    def available_indexes(self, state):
+        """
+        Return an array with the columns of the Q-learning table
+        of all of the available actions in the state `state`.
+        """
+        return self.transitions.indexes[self.state_index(state)]
+
+    def greedy_action(self, state):
+        """
+        Return the best action available in the state `state` (the one
+        with the highest Q-value, choosing at random among ties) along
+        with its Q-value, looking up all of the state's Q-values at once.
+
+        If there are no available actions in `state`, return `(None, 0)`.
+        """
+        indexes = self.available_indexes(state)
+        if not len(indexes):
+            return None, 0
+
+        q_values = self.q[self.state_index(state), indexes]
+        best = q_values.max()
+
+        return self.actions[random.choice(indexes[q_values == best])], best
+
     def update(self, old_state, action, new_state, reward):
         """
         Update Q-learning model, given an old state, an action taken
@@ -100,11 +289,9 @@ class NimAI():
     def get_q_value(self, state, action):
         """
         Return the Q-value for the state `state` and the action `action`.
-        If no Q-value exists yet in `self.q`, return 0.
+        If no Q-value has been learned yet in `self.q`, it is 0.
         """
-        state = tuple(state)
-        # Returns the state/action pair's Q-value if it exists in self.q, otherwise returns 0.
-        return self.q[state, action] if (state, action) in self.q else 0
+        return self.q[self.state_index(state), self.action_index(action)]
 
     def update_q_value(self, state, action, old_q, reward, future_rewards):
         """
@@ -122,7 +309,9 @@ class NimAI():
         is the sum of the current reward and estimated future rewards.
         """
         # Applies the formula to determine the new Q-value for a state/action pair.
-        self.q[tuple(state), action] = (old_q + self.alpha * ((reward + future_rewards) - old_q))
+        index = self.state_index(state), self.action_index(action)
+        self.q[index] = old_q + self.alpha * ((reward + future_rewards) - old_q)
+        self.visits[index] += 1
 
     def best_future_reward(self, state):
         """
@@ -134,15 +323,7 @@ class NimAI():
         Q-value in `self.q`. If there are no available actions in
         `state`, return 0.
         """
-        # If there are no available actions in state, returns 0.
-        if not Nim.available_actions(state):
-            return 0
-
-        state = tuple(state)
-        # Otherwise, creates a list of all Q-values for the available actions in a state.
-        q_values = [self.get_q_value(state, action) for action in Nim.available_actions(state)]
-        # Then, returns the max value from that list.
-        return max(q_values)
+        return self.greedy_action(state)[1]
 
     def choose_action(self, state, epsilon=True):
         """
@@ -159,29 +340,129 @@ class NimAI():
         If multiple actions have the same Q-value, any of those
         options is an acceptable return value.
         """
-        available_actions = Nim.available_actions(state)
         # If epsilon is True, with probability self.epsilon chooses a random available action.
         # (uses numpy.random to randomly pick a float between 0 and 1 and decide whether returning
         # a random action - if within the epsilon probability value - or continuing to find the best action).
         if epsilon and (numpy.random.uniform(0, 1) < self.epsilon):
-            return random.choice(list(available_actions))
+            return self.actions[random.choice(self.available_indexes(state))]
         # Otherwise returns the action with the highest Q-value.
-        for action in available_actions:
-            if self.get_q_value(state, action) == self.best_future_reward(state):
-                return action
+        return self.greedy_action(state)[0]
+
+
+class NimSolver():
+
+    def __init__(self, max_take=None, misere=True):
+        """
+        Initialize an exact solver of Nim games, where at most `max_take`
+        items can be removed from a pile in a single move (any number if None).
+
+        As in `Nim`, the player who removes the last item loses the game,
+        unless `misere` is False, in which case they win it.
+        """
+        self.max_take = max_take
+        self.misere = misere
 
+        # Memoized Grundy numbers of single piles, and outcomes of states
+        self.grundy_numbers = [0]
+        self.outcomes = dict()
 
-def train(n):
+    def grundy(self, pile):
+        """
+        Return the Grundy number of a single pile of size `pile`: the smallest
+        number that isn't the Grundy number of a pile it can be reduced to.
+        (https://en.wikipedia.org/wiki/Sprague%E2%80%93Grundy_theorem)
+        """
+        # Without a cap, a pile's Grundy number is its size.
+        if self.max_take is None:
+            return pile
+
+        while len(self.grundy_numbers) <= pile:
+            size = len(self.grundy_numbers)
+            reachable = set(self.grundy_numbers[max(0, size - self.max_take):size])
+            self.grundy_numbers.append(min(set(range(len(reachable) + 1)) - reachable))
+
+        return self.grundy_numbers[pile]
+
+    def is_winning(self, piles):
+        """
+        Return True if the player to move in a state with `piles`
+        wins the game playing optimally, False otherwise.
+        """
+        # In normal play, a state is winning if its piles' Grundy numbers have a non-zero xor.
+        if not self.misere:
+            return functools.reduce(operator.xor, (self.grundy(pile) for pile in piles), 0) != 0
+
+        # In misère Nim without a cap, a state is winning if its nim-sum is non-zero,
+        # except when no pile has more than one item: then taking the last item loses,
+        # so the state is winning with an even number of (single item) piles.
+        # (https://en.wikipedia.org/wiki/Nim#Mis%C3%A8re_game)
+        if self.max_take is None:
+            if all(pile <= 1 for pile in piles):
+                return sum(piles) % 2 == 0
+            return functools.reduce(operator.xor, piles, 0) != 0
+
+        # Otherwise search the game tree, memoizing each state's outcome
+        # (regardless of the order of the piles).
+        return self.search(tuple(sorted(pile for pile in piles if pile)))
+
+    def search(self, state):
+        """
+        Return True if the player to move wins from the sorted non-empty `state` piles.
+        """
+        if state not in self.outcomes:
+            if not state:
+                # The other player took the last item.
+                self.outcomes[state] = self.misere
+            else:
+                self.outcomes[state] = any(
+                    not self.search(tuple(sorted(
+                        pile - j if k == i else pile
+                        for k, pile in enumerate(state)
+                        if k != i or pile > j
+                    )))
+                    for i, j in Nim.available_actions(state, self.max_take)
+                )
+
+        return self.outcomes[state]
+
+    def winning_actions(self, piles):
+        """
+        Return the set of actions `(i, j)` with which the player to move
+        in a state with `piles` wins the game playing optimally
+        (an empty set if the state is losing).
+        """
+        actions = set()
+        for i, j in Nim.available_actions(piles, self.max_take):
+            new_piles = list(piles)
+            new_piles[i] -= j
+            if not self.is_winning(new_piles):
+                actions.add((i, j))
+
+        return actions
+
+    def choose_action(self, state, epsilon=False):
+        """
+        Given a state `state`, return an optimal action `(i, j)` to take:
+        a winning action if there is one, otherwise any available action.
+        (`epsilon` is ignored, so the solver can play like a `NimAI`.)
+        """
+        actions = self.winning_actions(state) or Nim.available_actions(state, self.max_take)
+
+        return random.choice(list(actions))
+
+
+def train(n, initial=[1, 3, 5, 7], max_take=None):
     """
-    Train an AI by playing `n` games against itself.
+    Train an AI by playing `n` games against itself,
+    starting from the `initial` piles (removing at most `max_take` items at once, if set).
     """
 
-    player = NimAI()
+    player = NimAI(initial=initial, max_take=max_take)
 
     # Play n games
     for i in range(n):
         print(f"Playing training game {i + 1}")
-        game = Nim()
+        game = Nim(initial, max_take)
 
         # Keep track of last move made by either player
         last = {
@@ -230,19 +511,218 @@ def train(n):
     return player
 
 
-def play(ai, human_player=None):
+def train_batch(n, batch_size=1024, player=None, seed=None, report_every=10000):
+    """
+    Train an AI by playing `n` games against itself, stepping up
+    to `batch_size` independent games at once with numpy.
+
+    Every step, each game in the batch makes an epsilon-greedy move
+    and the Q-values are updated as in `train`, all with array operations.
+    Updates of the same `(state, action)` pair by several games in the
+    same step are merged into one, towards the average of their new value estimates.
+
+    `player` can be set to an existing AI to keep training it,
+    and `seed` to make the training reproducible.
+    Progress is reported every `report_every` games.
+    """
+    if player is None:
+        player = NimAI()
+    rng = numpy.random.default_rng(seed)
+
+    q = player.q
+    available = player.transitions.available
+    successors = player.transitions.successors
+    initial_state = player.state_index(player.initial)
+
+    # Each game's current state and player, and the last state and action of each player
+    # (-1 before their first move).
+    batch_size = min(batch_size, n)
+    state = numpy.full(batch_size, initial_state)
+    turn = numpy.zeros(batch_size, dtype=int)
+    last_state = numpy.full((batch_size, 2), -1)
+    last_action = numpy.full((batch_size, 2), -1)
+    active = numpy.ones(batch_size, dtype=bool)
+
+    started = batch_size
+    finished = 0
+
+    while active.any():
+        games = numpy.flatnonzero(active)
+        s = state[games]
+        p = turn[games]
+
+        # Choose each game's action, at random among the available actions with probability
+        # epsilon, otherwise at random among the available actions with the highest Q-value.
+        q_values = numpy.where(available[s], q[s], -numpy.inf)
+        best = q_values == q_values.max(axis=1, keepdims=True)
+        explore = rng.random(len(games)) < player.epsilon
+        candidates = numpy.where(explore[:, None], available[s], best)
+        a = numpy.argmax(rng.random(candidates.shape) * candidates, axis=1)
+
+        # Make moves
+        new_s = successors[s, a]
+        over = new_s == 0
+        other = 1 - p
+
+        # The best future reward of each new state (0 when the game is over).
+        future = numpy.where(available[new_s], q[new_s], -numpy.inf).max(axis=1)
+        future[over] = 0
+
+        # When a game is over, the player who moved loses (reward -1) and the other player wins
+        # (reward 1); otherwise the other player's last move gets no reward yet.
+        previous = last_state[games, other] >= 0
+        rows = numpy.concatenate([s[over], last_state[games, other][previous]])
+        columns = numpy.concatenate([a[over], last_action[games, other][previous]])
+        targets = numpy.concatenate([
+            numpy.full(over.sum(), -1.0),
+            numpy.where(over, 1.0, future)[previous]
+        ])
+        pairs, pair = numpy.unique(rows * q.shape[1] + columns, return_inverse=True)
+        updates = numpy.bincount(pair)
+        targets = numpy.bincount(pair, targets) / updates
+        q.flat[pairs] += player.alpha * (targets - q.flat[pairs])
+        player.visits.flat[pairs] += updates
+
+        # Keep track of last state and action, and switch players
+        last_state[games, p] = s
+        last_action[games, p] = a
+        state[games] = new_s
+        turn[games] = other
+
+        # Start new games in place of the games that are over, until `n` games have been started.
+        done = games[over]
+        finished += len(done)
+        restart = done[:max(0, n - started)]
+        started += len(restart)
+        active[done[len(restart):]] = False
+        state[restart] = initial_state
+        turn[restart] = 0
+        last_state[restart] = -1
+        last_action[restart] = -1
+
+        if report_every and len(done) and finished // report_every > (finished - len(done)) // report_every:
+            print(f"Played {finished} training games")
+
+    if report_every:
+        print("Done training")
+
+    # Return the trained AI
+    return player
+
+
+def train_parallel(n, workers=None, rounds=10, merge="visits", seed=0, player=None):
+    """
+    Train an AI by playing `n` games against itself in `workers` processes
+    (all CPUs by default), with `train_batch`.
+
+    Training happens in `rounds` rounds: every round each worker trains
+    its own copy of the AI's Q-learning table, and the copies are then
+    merged back into the AI's table, either with their "average", or
+    weighted by how many times each Q-value was updated ("visits").
+
+    Each worker's training is seeded from `seed`, the round and the worker,
+    so training is reproducible for a given number of workers.
+    """
+    if merge not in ("average", "visits"):
+        raise Exception("Invalid merge")
+    if player is None:
+        player = NimAI()
+    workers = workers or multiprocessing.cpu_count()
+
+    with multiprocessing.Pool(workers) as pool:
+        for r in range(rounds):
+            # Split the round's games between workers.
+            games = n * (r + 1) // rounds - n * r // rounds
+            jobs = [
+                (player, games * (w + 1) // workers - games * w // workers, [seed, r, w])
+                for w in range(workers)
+            ]
+            results = pool.map(train_worker, jobs)
+
+            q = numpy.stack([q for q, _ in results])
+            visits = numpy.stack([visits for _, visits in results])
+            if merge == "average":
+                player.q = q.mean(axis=0)
+            else:
+                # Q-values no worker updated keep their previous value.
+                total = visits.sum(axis=0)
+                player.q = numpy.where(total > 0, (q * visits).sum(axis=0) / numpy.maximum(total, 1), player.q)
+            player.visits += visits.sum(axis=0)
+
+    return player
+
+
+def train_worker(job):
+    """
+    Train a copy of an AI by playing a number of games against itself.
+    Return the trained Q-learning table, and the number of updates of each Q-value.
+    """
+    player, games, seed = job
+    player.visits = numpy.zeros_like(player.visits)
+    train_batch(games, player=player, seed=seed, report_every=0)
+
+    return player.q, player.visits
+
+
+def convergence(n, checkpoints=10, player=None, seed=None):
+    """
+    Train an AI with `train_batch` for `n` games and, at `checkpoints` evenly
+    spaced points, measure how often its best action is optimal according to
+    `NimSolver`, over all of the states it can reach that have a winning action.
+
+    Return a list of `(games played, optimal moves rate)` pairs.
+    """
+    if player is None:
+        player = NimAI()
+    solver = NimSolver(max_take=player.max_take)
+
+    # Which actions are available, and which of those are winning, in every state with a winning action.
+    states = []
+    optimal = []
+    for state, piles in enumerate(player.transitions.piles):
+        winning = solver.winning_actions(piles)
+        if winning:
+            states.append(state)
+            optimal.append([action in winning for action in player.actions])
+    available = player.transitions.available[states]
+    optimal = numpy.array(optimal)
+
+    curve = []
+    played = 0
+    for checkpoint in range(1, checkpoints + 1):
+        games = n * checkpoint // checkpoints - played
+        train_batch(games, player=player, seed=None if seed is None else [seed, checkpoint], report_every=0)
+        played += games
+
+        # Ties between best actions are broken at random, so count the share of optimal ones.
+        q_values = numpy.where(available, player.q[states], -numpy.inf)
+        best = q_values == q_values.max(axis=1, keepdims=True)
+        rate = ((best & optimal).sum(axis=1) / best.sum(axis=1)).mean()
+        curve.append((played, rate))
+
+    return curve
+
+
+def play(ai, human_player=None, initial=[1, 3, 5, 7], max_take=None):
     """
     Play human game against the AI.
     `human_player` can be set to 0 or 1 to specify whether
     human player moves first or second.
+    `initial` and `max_take` set up the game as in `Nim`, and must be
+    those the AI was trained for (a `NimSolver` only needs the same `max_take`).
     """
 
+    # Check that the AI plays the same game
+    if ai.max_take != max_take or list(getattr(ai, "initial", initial)) != list(initial):
+        raise ValueError(f"The AI plays games starting from {getattr(ai, 'initial', 'any piles')} "
+                         f"with max_take={ai.max_take}, not from {initial} with max_take={max_take}")
+
     # If no player order set, choose human's order randomly
     if human_player is None:
         human_player = random.randint(0, 1)
 
     # Create new game
-    game = Nim()
+    game = Nim(initial, max_take)
 
     # Game loop
     while True:
@@ -255,7 +735,7 @@ def play(ai, human_player=None):
         print()
 
         # Compute available actions
-        available_actions = Nim.available_actions(game.piles)
+        available_actions = Nim.available_actions(game.piles, max_take)
         time.sleep(1)
 
         # Let human make a move
@@ -1,4 +1,14 @@
-from nim import train, play
+import os
+
+from nim import NimAI, train, play
+
+MODEL = "nim.model"
+
+# Load the trained AI if it was saved, otherwise train it and save it
+if os.path.exists(MODEL):
+    ai = NimAI.load(MODEL)
+else:
+    ai = train(10000)
+    ai.save(MODEL)
 
-ai = train(10000)
 play(ai)
@@ -1,21 +1,55 @@
+import math
 import os
+import posixpath
 import sys
+import time
 import random
 from random import choices
 import re
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+import numpy
+from numpy.lib.format import open_memmap
+from scipy import sparse
 
 DAMPING = 0.85
 SAMPLES = 10000
 PROBABILITIES_SUM = 1
+# Convergence tolerance (on the L1 norm of the ranks' change) and iteration cap of the sparse engine
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 1000
+# Number of blocks of pages updated in turn by the Gauss-Seidel solver
+GAUSS_SEIDEL_BLOCKS = 64
+# Number of iterations between extrapolations of the Aitken solver
+EXTRAPOLATION_PERIOD = 10
+# Number of iterations between updates of all pages by the adaptive solver
+ADAPTIVE_PERIOD = 10
+# Number of characters of a page read (and parsed) at a time by `parallel_crawl`
+CHUNK_SIZE = 65536
+# Number of links streamed from disk at a time by `out_of_core_pagerank`
+BLOCK_SIZE = 1 << 22
 
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python pagerank.py corpus [state]")
 
     corpus = crawl(sys.argv[1])
 
+    # Update the ranks saved in the state file by a previous run (if any) to the current corpus,
+    # instead of computing them from scratch
+    if len(sys.argv) == 3:
+        ranks, iterations = incremental_pagerank(sys.argv[2], DAMPING, corpus=corpus)
+
+        print(f"PageRank Results from Incremental Iteration ({iterations} iterations)")
+
+        for page in sorted(ranks):
+            print(f"  {page}: {ranks[page]:.4f}")
+        return
+
     ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
 
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
@@ -58,7 +92,117 @@ def crawl(directory):
     return pages
 
 
-def transition_model(corpus, page, damping_factor):
+def parallel_crawl(directory, workers=None, edge_list=None):
+    """
+    Parse a directory of HTML pages, and any directories nested in it,
+    in `workers` processes (all CPUs by default), and check for links to other pages.
+    Pages are named by their path relative to `directory` (just the filename for
+    pages directly in it), and links are resolved relative to the page they're in
+    (or to `directory` if they start with "/").
+    Optionally write the resulting link graph to the `edge_list` file (see `write_edge_list`).
+
+    Return a dictionary where each key is a page, and values are
+    a set of all other pages in the corpus that are linked to by the page.
+    """
+    names = []
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            if filename.endswith(".html"):
+                path = os.path.relpath(os.path.join(root, filename), directory)
+                names.append(path.replace(os.sep, "/"))
+
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(workers) as executor:
+        jobs = [(directory, name) for name in names]
+        links = executor.map(page_links, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+        pages = dict(zip(names, links))
+
+    # Only include links to other pages in the corpus
+    for page in pages:
+        pages[page] = set(link for link in pages[page] if link in pages and link != page)
+
+    if edge_list:
+        write_edge_list(pages, edge_list)
+
+    return pages
+
+
+class LinkParser(HTMLParser):
+    """
+    HTML parser collecting the `href` of every `<a>` tag it's fed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.links = set()
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            for name, value in attrs:
+                if name == "href" and value:
+                    self.links.add(value)
+
+
+def page_links(job):
+    """
+    Return the set of pages (as named by `parallel_crawl`) linked to by the page
+    `name` in `directory`, reading and parsing the file a chunk at a time.
+    """
+    directory, name = job
+    parser = LinkParser()
+    with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            parser.feed(chunk)
+    parser.close()
+
+    links = set()
+    for href in parser.links:
+        url = urlsplit(href)
+        # Skip links to other sites, and links to a fragment of the same page.
+        if url.scheme or url.netloc or not url.path:
+            continue
+        if url.path.startswith("/"):
+            path = url.path.lstrip("/")
+        else:
+            path = posixpath.join(posixpath.dirname(name), url.path)
+        links.add(posixpath.normpath(path))
+
+    return links
+
+
+def write_edge_list(corpus, filename):
+    """
+    Write a corpus' link graph to the file `filename`: the number of pages,
+    then each page's name (one per line), then each link as the
+    numbers of the linking and the linked page (one link per line).
+    """
+    pages = list(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+
+    with open(filename, "w") as f:
+        f.write(f"{len(pages)}\n")
+        f.writelines(f"{page}\n" for page in pages)
+        for i, page in enumerate(pages):
+            f.writelines(f"{i} {index[link]}\n" for link in corpus[page] if link in index)
+
+
+def read_edge_list(filename):
+    """
+    Read a link graph written by `write_edge_list`.
+    Return a dictionary where each key is a page, and values are
+    a set of all other pages in the corpus that are linked to by the page.
+    """
+    with open(filename) as f:
+        pages = [f.readline().rstrip("\n") for _ in range(int(f.readline()))]
+        corpus = {page: set() for page in pages}
+        for line in f:
+            source, target = line.split()
+            corpus[pages[int(source)]].add(pages[int(target)])
+
+    return corpus
+
+
+def transition_model(corpus, page, damping_factor, personalization=None):
     """
     Return a probability distribution over which page to visit next,
     given a current page.
@@ -66,20 +210,33 @@ def transition_model(corpus, page, damping_factor):
     With probability `damping_factor`, choose a link at random
     linked to by `page`. With probability `1 - damping_factor`, choose
     a link at random chosen from all pages in the corpus.
+
+    If `personalization` is given (a dictionary of weights of pages),
+    pages are chosen from all pages in the corpus with probabilities
+    proportional to their weight instead of uniformly
+    (raise ValueError if no page of the corpus has a positive weight).
     """
+    # Probability of choosing each page from all pages in the corpus.
+    if personalization is None:
+        teleport = {pg: PROBABILITIES_SUM / len(corpus) for pg in corpus}
+    else:
+        total = sum(personalization.get(pg, 0) for pg in corpus)
+        if total <= 0:
+            raise ValueError("Personalization gives no positive weight to pages of the corpus")
+        teleport = {pg: personalization.get(pg, 0) / total for pg in corpus}
+
     # `1 - damping_factor`.
     one_minus_df = PROBABILITIES_SUM - damping_factor
     # Probability for page with no links.
-    no_links_probability = PROBABILITIES_SUM / len(corpus)
-    probabilities = {pg: no_links_probability for pg in corpus if not corpus[page]}
+    probabilities = {pg: teleport[pg] for pg in corpus if not corpus[page]}
 
     if corpus[page]:
         # Calculates `damping_factor` probability.
         df_probability = damping_factor / len(corpus[page])
-        # Calculates `1 - damping_factor` probability.
-        one_minus_df_probability = one_minus_df / len(corpus)
 
         for pg in corpus:
+            # Calculates `1 - damping_factor` probability.
+            one_minus_df_probability = one_minus_df * teleport[pg]
             # Calculates the probability based on a page being a link in the passed page or not.
             if pg in corpus[page]:
                 probabilities[pg] = df_probability + one_minus_df_probability
@@ -118,22 +275,93 @@ def sample_pagerank(corpus, damping_factor, n):
     return page_ranks
 
 
-def iterate_pagerank(corpus, damping_factor):
+def vectorized_sample_pagerank(corpus, damping_factor, n, walkers=1000, burn_in=50, seed=None):
+    """
+    Return PageRank values for each page, as `sample_pagerank` does,
+    by sampling `n` pages from `walkers` random surfers moving at once.
+
+    Each step of each surfer takes constant time: with probability
+    `damping_factor` it follows one of its page's links chosen uniformly
+    (looked up in an array of every page's links), otherwise, or if its page
+    has no links, it jumps to a page chosen uniformly from the whole corpus.
+    Surfers start at random pages, and their first `burn_in` pages aren't
+    counted, so the samples come from the surfers' stationary distribution.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    pages, matrix, _ = transition_matrix(corpus)
+    # The links of page `i` are `targets[first[i]:first[i + 1]]`.
+    links = matrix.T.tocsr()
+    first, targets = links.indptr, links.indices
+    num_links = numpy.diff(first)
+
+    rng = numpy.random.default_rng(seed)
+    N = len(pages)
+    walkers = min(walkers, n)
+    samples = numpy.zeros(N, dtype=numpy.int64)
+    current = rng.integers(N, size=walkers)
+
+    for step in range(burn_in + math.ceil(n / walkers)):
+        following = numpy.flatnonzero((rng.random(walkers) < damping_factor) & (num_links[current] > 0))
+        link = (rng.random(len(following)) * num_links[current[following]]).astype(numpy.int64)
+
+        next_pages = rng.integers(N, size=walkers)
+        next_pages[following] = targets[first[current[following]] + link]
+        current = next_pages
+
+        if step >= burn_in:
+            # The last step may only need some of the surfers' pages.
+            count = min(walkers, n - (step - burn_in) * walkers)
+            samples += numpy.bincount(current[:count], minlength=N)
+
+    return dict(zip(pages, (samples / n).tolist()))
+
+
+def iterate_pagerank(corpus, damping_factor, solver=None, tolerance=TOLERANCE,
+                     max_iterations=MAX_ITERATIONS, report=False):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
 
+    If `solver` is None, PageRank values are updated page by page until
+    no value changes by more than 0.001. Otherwise they are updated with
+    `sparse_pagerank` using that solver (see `SOLVERS`), until the L1 norm
+    of their change is below `tolerance`.
+    Either way, iteration stops after `max_iterations` iterations, and
+    the number of iterations and the time taken are printed if `report` is True.
+
+    `corpus` can also be the path of a graph directory written by `write_graph`,
+    in which case it is ranked by `out_of_core_pagerank`, streaming its links from disk
+    with power iteration (raise ValueError if `solver` is another solver).
+
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
+    check_iterations(max_iterations)
+    if isinstance(corpus, str):
+        if solver not in [None, "power"]:
+            raise ValueError(f"Graph directories are ranked out of core with power iteration, not {solver}")
+        start = time.perf_counter()
+        ranks, iterations, converged = out_of_core_pagerank(corpus, damping_factor, tolerance, max_iterations)
+        if report:
+            print(f"{convergence(iterations, converged).capitalize()} ({time.perf_counter() - start:.4f}s, out of core)")
+        return dict(zip(graph_pages(corpus), ranks.tolist()))
+
+    if solver is not None:
+        return sparse_pagerank(corpus, damping_factor, solver, tolerance, max_iterations, report)
+
+    start = time.perf_counter()
     N = len(corpus)
     threshold = 0.001
     # We assign an initial rank of 1 / corpus length to each page.
     initial_rank = PROBABILITIES_SUM / N
     page_ranks = {page: initial_rank for page in corpus}
 
-    while True:
+    converged = False
+    for iteration in range(1, max_iterations + 1):
         # For each page in corpus we apply the PR(p) formula (please see below).
         current_page_ranks = {page: calculate_page_rank(corpus, page, damping_factor, page_ranks) for page in corpus}
         # For each page in corpus we check the difference between the previous and the current page rank.
@@ -142,13 +370,34 @@ def iterate_pagerank(corpus, damping_factor):
             margin = max(margin, abs(current_page_ranks[page] - page_ranks[page]))
         # If we reach the threshold we interrupt the iteration and return the pages ranks.
         if margin < threshold:
+            converged = True
             break
         # Otherwise we keep re-assigning the page ranks to the current (temporary) page ranks.
         page_ranks = current_page_ranks.copy()
 
+    if report:
+        print(f"{convergence(iteration, converged).capitalize()} ({time.perf_counter() - start:.4f}s)")
+
     return page_ranks
 
 
+def check_iterations(max_iterations):
+    """
+    Raise ValueError unless iterative computations may run at least one iteration.
+    """
+    if max_iterations < 1:
+        raise ValueError(f"max_iterations must be at least 1, not {max_iterations}")
+
+
+def convergence(iterations, converged):
+    """
+    Describe how an iterative computation stopped after `iterations` iterations.
+    """
+    if converged:
+        return f"converged in {iterations} iterations"
+    return f"stopped after {iterations} iterations (not converged)"
+
+
 def calculate_page_rank(corpus, page, damping_factor, page_ranks):
     N = len(corpus)
     linked_pages_sum = 0
@@ -173,5 +422,506 @@ def calculate_page_rank(corpus, page, damping_factor, page_ranks):
     return page_rank
 
 
+def transition_matrix(corpus):
+    """
+    Build the link graph of a corpus (as returned by `crawl`) as a sparse matrix.
+
+    Return a tuple `(pages, matrix, dangling)` where `pages` is the list of
+    pages (in the order of the matrix's rows and columns), `matrix` is a
+    CSR matrix where `matrix[j, i]` is `1 / NumLinks(i)` if page `i` links to
+    page `j`, and `dangling` is a boolean array of the pages with no links.
+    """
+    pages = list(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+
+    # The target of each link to a page in the corpus, page by page.
+    targets = []
+    num_links = numpy.zeros(len(pages), dtype=numpy.int64)
+    for i, page in enumerate(pages):
+        links = [index[link] for link in corpus[page] if link in index]
+        targets += links
+        num_links[i] = len(links)
+    targets = numpy.array(targets, dtype=numpy.int64)
+    sources = numpy.repeat(numpy.arange(len(pages)), num_links)
+
+    matrix = sparse.csr_matrix(
+        (1 / num_links[sources], (targets, sources)),
+        shape=(len(pages), len(pages))
+    )
+
+    return pages, matrix, num_links == 0
+
+
+def power_iteration(matrix, dangling, damping_factor, ranks=None,
+                    tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Apply the PR(p) formula to all pages at once, as a sparse matrix-vector product,
+    starting from `ranks` (1 / N for each page if None), until the L1 norm of the
+    ranks' change is below `tolerance` or `max_iterations` iterations.
+    Pages with no links are interpreted as having one link for every page (including themselves).
+
+    Return the array of ranks, the number of iterations, and whether the change went below `tolerance`.
+    """
+    check_iterations(max_iterations)
+    N = matrix.shape[0]
+    ranks = numpy.full(N, PROBABILITIES_SUM / N) if ranks is None else ranks
+    teleport = (PROBABILITIES_SUM - damping_factor) / N
+
+    converged = False
+    for iteration in range(1, max_iterations + 1):
+        # The probability of pages with no links is divided equally by all the pages in the corpus.
+        new_ranks = teleport + damping_factor * (matrix @ ranks + ranks[dangling].sum() / N)
+        change = numpy.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if change < tolerance:
+            converged = True
+            break
+
+    return ranks, iteration, converged
+
+
+def gauss_seidel(matrix, dangling, damping_factor, ranks=None,
+                 tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Like `power_iteration`, but updating the pages in blocks of rows of the
+    transition matrix, each block using the values just computed by the
+    previous blocks (block Gauss-Seidel), which usually takes fewer iterations.
+
+    Return the array of ranks, the number of iterations, and whether the change went below `tolerance`.
+    """
+    check_iterations(max_iterations)
+    N = matrix.shape[0]
+    ranks = numpy.full(N, PROBABILITIES_SUM / N) if ranks is None else ranks.copy()
+    teleport = (PROBABILITIES_SUM - damping_factor) / N
+
+    bounds = numpy.linspace(0, N, min(GAUSS_SEIDEL_BLOCKS, N) + 1).astype(int)
+    blocks = [(start, end, matrix[start:end], dangling[start:end]) for start, end in zip(bounds, bounds[1:])]
+    dangling_sum = ranks[dangling].sum()
+
+    converged = False
+    for iteration in range(1, max_iterations + 1):
+        previous = ranks.copy()
+        for start, end, rows, block_dangling in blocks:
+            new_ranks = teleport + damping_factor * (rows @ ranks + dangling_sum / N)
+            dangling_sum += (new_ranks - ranks[start:end])[block_dangling].sum()
+            ranks[start:end] = new_ranks
+
+        # Unlike a power iteration, a sweep doesn't keep the PageRank values' sum to 1, so rescale them.
+        ranks /= ranks.sum()
+        dangling_sum = ranks[dangling].sum()
+        if numpy.abs(ranks - previous).sum() < tolerance:
+            converged = True
+            break
+
+    return ranks, iteration, converged
+
+
+def aitken_iteration(matrix, dangling, damping_factor, ranks=None,
+                     tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Like `power_iteration`, but every `EXTRAPOLATION_PERIOD` iterations replace
+    the ranks with their Aitken extrapolation from the last three iterations
+    (x2 - (x2 - x1)^2 / (x2 - 2 * x1 + x0), for each page), which removes
+    most of the error from the slowest converging pages.
+
+    Return the array of ranks, the number of iterations, and whether the change went below `tolerance`.
+    """
+    check_iterations(max_iterations)
+    N = matrix.shape[0]
+    ranks = numpy.full(N, PROBABILITIES_SUM / N) if ranks is None else ranks
+    teleport = (PROBABILITIES_SUM - damping_factor) / N
+    history = []
+
+    converged = False
+    for iteration in range(1, max_iterations + 1):
+        new_ranks = teleport + damping_factor * (matrix @ ranks + ranks[dangling].sum() / N)
+        change = numpy.abs(new_ranks - ranks).sum()
+        history = (history + [new_ranks])[-3:]
+        ranks = new_ranks
+        if change < tolerance:
+            converged = True
+            break
+
+        if iteration % EXTRAPOLATION_PERIOD == 0 and len(history) == 3:
+            x0, x1, x2 = history
+            denominator = x2 - 2 * x1 + x0
+            # Pages that aren't converging geometrically keep their last value.
+            usable = numpy.abs(denominator) > 1e-15
+            extrapolated = x2.copy()
+            extrapolated[usable] -= (x2 - x1)[usable] ** 2 / denominator[usable]
+            extrapolated = numpy.maximum(extrapolated, 0)
+            ranks = extrapolated / extrapolated.sum()
+            history = []
+
+    return ranks, iteration, converged
+
+
+def adaptive_iteration(matrix, dangling, damping_factor, ranks=None,
+                       tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Like `power_iteration`, but once a page's rank changes by less than
+    `tolerance / N` in an iteration it is considered converged, and is no
+    longer updated, so each iteration only computes the rows of the pages
+    still converging.
+    As a page can start changing again when the pages linking to it do, every
+    `ADAPTIVE_PERIOD` iterations, and before stopping, all pages are updated again.
+
+    Return the array of ranks, the number of iterations, and whether the change went below `tolerance`.
+    """
+    check_iterations(max_iterations)
+    N = matrix.shape[0]
+    ranks = numpy.full(N, PROBABILITIES_SUM / N) if ranks is None else ranks.copy()
+    teleport = (PROBABILITIES_SUM - damping_factor) / N
+    active = numpy.arange(N)
+    rows = matrix
+
+    converged = False
+    for iteration in range(1, max_iterations + 1):
+        new_ranks = teleport + damping_factor * (rows @ ranks + ranks[dangling].sum() / N)
+        difference = numpy.abs(new_ranks - ranks[active])
+        ranks[active] = new_ranks
+
+        # Only stop after an iteration updating all pages.
+        change = difference.sum()
+        if len(active) == N and change < tolerance:
+            converged = True
+            break
+
+        if change < tolerance or iteration % ADAPTIVE_PERIOD == 0:
+            active = numpy.arange(N)
+            rows = matrix
+        else:
+            converging = difference >= tolerance / N
+            if not converging.all():
+                active = active[converging]
+                rows = matrix[active]
+
+    return ranks / ranks.sum(), iteration, converged
+
+
+# Solvers available to `sparse_pagerank`
+SOLVERS = {
+    "power": power_iteration,
+    "gauss-seidel": gauss_seidel,
+    "aitken": aitken_iteration,
+    "adaptive": adaptive_iteration
+}
+
+
+def sparse_pagerank(corpus, damping_factor, solver="power", tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, report=False):
+    """
+    Return PageRank values for each page, as `iterate_pagerank` does,
+    by iterating on the corpus' sparse transition matrix with one of `SOLVERS`,
+    until the L1 norm of the ranks' change is below `tolerance`
+    or `max_iterations` iterations.
+    If `report` is True, print the number of iterations (and whether the ranks
+    converged), the time taken and the L1 norm of the residual of the PageRank equations.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver {solver}, expected one of {', '.join(SOLVERS)}")
+
+    pages, matrix, dangling = transition_matrix(corpus)
+
+    start = time.perf_counter()
+    ranks, iterations, converged = SOLVERS[solver](matrix, dangling, damping_factor,
+                                                   tolerance=tolerance, max_iterations=max_iterations)
+    seconds = time.perf_counter() - start
+
+    if report:
+        N = len(pages)
+        residual = (PROBABILITIES_SUM - damping_factor) / N + damping_factor * (
+            matrix @ ranks + ranks[dangling].sum() / N
+        ) - ranks
+        print(f"{solver}: {convergence(iterations, converged)} ({seconds:.4f}s), "
+              f"residual {numpy.abs(residual).sum():.2e}")
+
+    return dict(zip(pages, ranks.tolist()))
+
+
+def personalized_pagerank(corpus, damping_factor, personalizations,
+                          tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Return personalized PageRank values for each page, for each of the
+    `personalizations`: a dictionary mapping a name (e.g. a topic) to a
+    dictionary of weights of pages.
+
+    As in `transition_model` with a personalization, the random surfer
+    jumps to pages with probabilities proportional to their weight
+    (instead of uniformly), and does so from pages with no links as well.
+    All of the personalizations are computed at once, iterating on a
+    matrix with a column of PageRank values per personalization, until the
+    L1 norm of every column's change is below `tolerance` or `max_iterations` iterations.
+
+    Return a dictionary where keys are personalization names, and values are
+    dictionaries of PageRank values (as `iterate_pagerank` returns), the number
+    of iterations, and whether every column's change went below `tolerance`.
+    Raise ValueError if a personalization has no positive weight on pages of the corpus.
+    """
+    check_iterations(max_iterations)
+    pages, matrix, dangling = transition_matrix(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    names = list(personalizations)
+
+    # Teleport probabilities (usually of few pages), as (page, column, probability) triples.
+    rows, columns, weights = [], [], []
+    for column, name in enumerate(names):
+        total = sum(weight for page, weight in personalizations[name].items() if page in index)
+        if total <= 0:
+            raise ValueError(f"Personalization {name!r} gives no positive weight to pages of the corpus")
+        for page, weight in personalizations[name].items():
+            if page in index:
+                rows.append(index[page])
+                columns.append(column)
+                weights.append(weight / total)
+    rows = numpy.array(rows, dtype=numpy.int64)
+    columns = numpy.array(columns, dtype=numpy.int64)
+    weights = numpy.array(weights)
+
+    ranks = numpy.zeros((len(pages), len(names)))
+    numpy.add.at(ranks, (rows, columns), weights)
+    converged = False
+    for iteration in range(1, max_iterations + 1):
+        # Each column's surfer leaves pages with no links (and jumps, with
+        # probability `1 - damping_factor`) to pages chosen by its own teleport probabilities.
+        jumping = (PROBABILITIES_SUM - damping_factor) + damping_factor * ranks[dangling].sum(axis=0)
+        new_ranks = matrix @ ranks
+        new_ranks *= damping_factor
+        numpy.add.at(new_ranks, (rows, columns), weights * jumping[columns])
+        change = numpy.abs(new_ranks - ranks).sum(axis=0).max()
+        ranks = new_ranks
+        if change < tolerance:
+            converged = True
+            break
+
+    personalized_ranks = {
+        name: dict(zip(pages, ranks[:, column].tolist()))
+        for column, name in enumerate(names)
+    }
+
+    return personalized_ranks, iteration, converged
+
+
+def incremental_pagerank(filename, damping_factor, corpus=None, added_pages=None, removed_pages=None,
+                         added_links=None, removed_links=None, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Update the PageRank values saved in the state file `filename` (if it exists) to a changed corpus,
+    and save them back along with the corpus.
+
+    The changed corpus is either `corpus`, or the saved corpus changed with
+    `update_corpus(corpus, added_pages, removed_pages, added_links, removed_links)`.
+    Power iteration starts from the saved PageRank values (new pages start
+    from 1 / N) instead of from 1 / N for each page, so small changes to the
+    corpus converge in a few iterations.
+
+    Return a dictionary of PageRank values (as `sparse_pagerank` does),
+    and the number of iterations.
+    """
+    previous_corpus, previous_ranks = load_ranks(filename) if os.path.exists(filename) else (dict(), dict())
+    if corpus is None:
+        corpus = update_corpus(previous_corpus, added_pages, removed_pages, added_links, removed_links)
+
+    pages, matrix, dangling = transition_matrix(corpus)
+    N = len(pages)
+    ranks = numpy.array([previous_ranks.get(page, PROBABILITIES_SUM / N) for page in pages])
+    # Removed and added pages change the total, so make the PageRank values sum to 1 again.
+    ranks *= PROBABILITIES_SUM / ranks.sum()
+
+    ranks, iterations, _ = power_iteration(matrix, dangling, damping_factor, ranks,
+                                           tolerance=tolerance, max_iterations=max_iterations)
+    ranks = dict(zip(pages, ranks.tolist()))
+    save_ranks(filename, corpus, ranks)
+
+    return ranks, iterations
+
+
+def update_corpus(corpus, added_pages=None, removed_pages=None, added_links=None, removed_links=None):
+    """
+    Return a copy of `corpus` where
+        * the pages in the `added_pages` dictionary are added, with their set of links, and
+        * the pages in `removed_pages` are removed, along with every link to them, and
+        * the `(page, link)` pairs in `added_links` are added, and
+        * the `(page, link)` pairs in `removed_links` are removed.
+    Raise ValueError if a link is added from a page that is not in the corpus
+    (or is removed by the same update).
+    """
+    corpus = {page: set(links) for page, links in corpus.items()}
+
+    for page, links in (added_pages or dict()).items():
+        corpus[page] = set(links)
+    for page in removed_pages or []:
+        corpus.pop(page, None)
+    for page, link in added_links or []:
+        if page not in corpus:
+            raise ValueError(f"Cannot add link ({page}, {link}): {page} is not in the corpus")
+        corpus[page].add(link)
+    for page, link in removed_links or []:
+        # Links of removed pages are already gone.
+        if page in corpus:
+            corpus[page].discard(link)
+
+    # Only include links to other pages in the corpus
+    for page in corpus:
+        corpus[page] = set(link for link in corpus[page] if link in corpus and link != page)
+
+    return corpus
+
+
+def save_ranks(filename, corpus, ranks):
+    """
+    Save a corpus' link graph and PageRank values to the file `filename` (a numpy .npz archive).
+    """
+    pages = list(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    links = [(i, index[link]) for i, page in enumerate(pages) for link in corpus[page] if link in index]
+
+    with open(filename, "wb") as f:
+        numpy.savez(
+            f,
+            pages=numpy.array(pages, dtype=str),
+            ranks=numpy.array([ranks[page] for page in pages]),
+            links=numpy.array(links, dtype=numpy.int64).reshape(-1, 2)
+        )
+
+
+def load_ranks(filename):
+    """
+    Load a corpus' link graph and PageRank values saved with `save_ranks`.
+    Return the corpus (as `crawl` does) and a dictionary of PageRank values.
+    """
+    with numpy.load(filename) as data:
+        pages = data["pages"].tolist()
+        ranks = dict(zip(pages, data["ranks"].tolist()))
+        corpus = {page: set() for page in pages}
+        for source, target in data["links"].tolist():
+            corpus[pages[source]].add(pages[target])
+
+    return corpus, ranks
+
+
+def write_graph(edge_list, directory):
+    """
+    Convert an edge list file written by `write_edge_list` into a graph
+    directory that PageRank can be computed from without loading it in memory:
+        * `pages.txt`: each page's name, one per line
+        * `indptr.npy`, `indices.npy`: the links as a CSR matrix with a row per
+          linked page, sorted by linked page: the pages linking to page `j`
+          are `indices[indptr[j]:indptr[j + 1]]`
+        * `num_links.npy`: the number of links of each page
+
+    The edge list is read twice, a chunk at a time, and the arrays are written
+    through memory-mapped files, so graphs larger than memory can be converted.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    with open(edge_list) as f:
+        # Pages, and the number of links of and to each page.
+        N = int(f.readline())
+        with open(os.path.join(directory, "pages.txt"), "w") as pages:
+            for _ in range(N):
+                pages.write(f.readline())
+        start = f.tell()
+
+        num_links = numpy.zeros(N, dtype=numpy.int64)
+        num_linked = numpy.zeros(N, dtype=numpy.int64)
+        for sources, targets in edge_chunks(f):
+            num_links += numpy.bincount(sources, minlength=N)
+            num_linked += numpy.bincount(targets, minlength=N)
+
+        index_type = numpy.int32 if N < 2 ** 31 else numpy.int64
+        indptr = open_memmap(os.path.join(directory, "indptr.npy"), mode="w+", dtype=numpy.int64, shape=(N + 1,))
+        indptr[0] = 0
+        numpy.cumsum(num_linked, out=indptr[1:])
+        indices = open_memmap(os.path.join(directory, "indices.npy"), mode="w+",
+                              dtype=index_type, shape=(int(indptr[-1]),))
+        numpy.save(os.path.join(directory, "num_links.npy"), num_links)
+
+        # Place each link in its linked page's row, after the links already placed there.
+        placed = numpy.array(indptr[:-1])
+        f.seek(start)
+        for sources, targets in edge_chunks(f):
+            order = numpy.argsort(targets, kind="stable")
+            sources, targets = sources[order], targets[order]
+            first = numpy.searchsorted(targets, targets)
+            indices[placed[targets] + numpy.arange(len(targets)) - first] = sources
+            placed += numpy.bincount(targets, minlength=N)
+
+        indptr.flush()
+        indices.flush()
+
+
+def edge_chunks(f):
+    """
+    Yield the links read from an open edge list file, a chunk of lines at a time,
+    as arrays of linking and linked pages' numbers.
+    """
+    while lines := f.readlines(CHUNK_SIZE * 16):
+        edges = numpy.fromstring("".join(lines), dtype=numpy.int64, sep=" ")
+        yield edges[0::2], edges[1::2]
+
+
+def out_of_core_pagerank(directory, damping_factor, tolerance=TOLERANCE,
+                         max_iterations=MAX_ITERATIONS, block_size=BLOCK_SIZE):
+    """
+    Return PageRank values for each page of a graph directory written by `write_graph`,
+    streaming its links from disk in blocks of rows of at most about `block_size` links,
+    so only vectors of N values (like the PageRank values) are kept in memory.
+    Iterate until the L1 norm of the ranks' change is below `tolerance` or `max_iterations` iterations.
+
+    Return the array of PageRank values (in the order of `pages.txt`), the number of iterations,
+    and whether the change went below `tolerance`.
+    """
+    check_iterations(max_iterations)
+    indptr = numpy.load(os.path.join(directory, "indptr.npy"), mmap_mode="r")
+    indices = numpy.load(os.path.join(directory, "indices.npy"), mmap_mode="r")
+    num_links = numpy.load(os.path.join(directory, "num_links.npy"))
+
+    N = len(num_links)
+    dangling = num_links == 0
+    inverse_links = numpy.where(dangling, 0, 1 / numpy.maximum(num_links, 1))
+    teleport = (PROBABILITIES_SUM - damping_factor) / N
+
+    # Split rows into blocks of about `block_size` links (and at least one row).
+    # Blocks start at the first row, even without links (a graph with no links is a single block).
+    starts = numpy.searchsorted(indptr, numpy.arange(0, indptr[-1], block_size), side="right") - 1
+    bounds = numpy.unique(numpy.concatenate([[0], starts]))
+    bounds = numpy.append(bounds[bounds < N], N)
+
+    ranks = numpy.full(N, PROBABILITIES_SUM / N)
+    converged = False
+    for iteration in range(1, max_iterations + 1):
+        # Each page's probability, divided by its number of links.
+        shares = ranks * inverse_links
+        base = teleport + damping_factor * ranks[dangling].sum() / N
+
+        # Pages without incoming links only get the base probability.
+        new_ranks = numpy.full(N, base)
+        for first, last in zip(bounds, bounds[1:]):
+            lo, hi = indptr[first], indptr[last]
+            rows = numpy.repeat(numpy.arange(last - first), numpy.diff(indptr[first:last + 1]))
+            linked_sum = numpy.bincount(rows, weights=shares[indices[lo:hi]], minlength=last - first)
+            new_ranks[first:last] = base + damping_factor * linked_sum
+
+        change = numpy.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if change < tolerance:
+            converged = True
+            break
+
+    return ranks, iteration, converged
+
+
+def graph_pages(directory):
+    """
+    Return the list of page names of a graph directory written by `write_graph`.
+    """
+    with open(os.path.join(directory, "pages.txt")) as f:
+        return f.read().splitlines()
+
+
 if __name__ == "__main__":
     main()